@@ -0,0 +1,205 @@
+"""Benchmarks for the storage and analysis code in main.py.
+
+Generates synthetic data directories (fully populated days with realistic
+notes) and times the hot paths without opening any windows. Results are
+written as JSON so runs can be compared later.
+
+Usage:
+    python benchmark.py --years 1 10 50 --output results.json
+    python benchmark.py --backend sqlite --output sqlite.json
+    python benchmark.py --compare baseline.json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import main as app
+
+DEFAULT_YEARS = (1, 10, 50)
+DEFAULT_REPEAT = 20
+REGRESSION_THRESHOLD = 0.20 # Flag metrics whose median got more than 20% slower
+
+NOTE_WORDS = (
+    "gym", "read", "slept", "late", "early", "meeting", "project", "walk", "tired",
+    "focused", "coffee", "family", "coding", "study", "ran", "groceries", "rest",
+    "headache", "great", "day", "worked", "on", "the", "new", "feature", "and",
+)
+
+
+def make_day(rng):
+    """Returns one fully populated day, like a form save would store it."""
+    notes = " ".join(rng.choice(NOTE_WORDS) for _ in range(rng.randint(0, 40)))
+    data = {
+        'morning_juice': rng.choice(["Yes", "No"]),
+        'water_intake': round(rng.uniform(0.5, 4.0), 1),
+        'sleep_hours': round(rng.uniform(4.0, 10.0), 1),
+        'self_improvement_time': rng.randint(0, 120),
+        'education_time': rng.randint(0, 240),
+        'github_commits': rng.randint(0, 30),
+        'linkedin_posts': rng.randint(0, 3),
+        'linkedin_engagement': rng.randint(0, 60),
+        'facebook_posts': rng.randint(0, 3),
+        'facebook_engagement': rng.randint(0, 90),
+        'instagram_posts': rng.randint(0, 3),
+        'instagram_engagement': rng.randint(0, 90),
+        'money_earned': round(rng.uniform(0, 300), 2),
+        'money_spent': round(rng.uniform(0, 150), 2),
+    }
+    if notes:
+        data['notes'] = notes
+    return data
+
+
+def generate_dataset(data_dir, years, last_year, seed=0):
+    """Fills `data_dir` with every day of `years` years ending with `last_year`."""
+    rng = random.Random(seed)
+    handler = app.DataHandler(data_dir)
+    for year in range(last_year - years + 1, last_year + 1):
+        day = date(year, 1, 1)
+        records = []
+        while day.year == year:
+            records.append((day, make_day(rng)))
+            day += timedelta(days=1)
+        handler.save_many(records)
+    return handler
+
+
+def time_call(func, repeat, setup=None):
+    """Runs `func` `repeat` times and returns timing statistics in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        'min_ms': min(samples),
+        'median_ms': statistics.median(samples),
+        'mean_ms': statistics.fmean(samples),
+        'runs': repeat,
+    }
+
+
+def run_dataset(years, backend, repeat, last_year=2025):
+    """Generates one dataset and times every benchmark against it."""
+    data_dir = tempfile.mkdtemp(prefix=f"bench-{years}y-")
+    try:
+        generate_dataset(data_dir, years, last_year)
+        if backend == 'sqlite':
+            app.migrate_json_to_sqlite(data_dir)
+            handler = app.SqliteDataHandler(data_dir)
+        elif backend == 'binary':
+            app.migrate_json_to_binary(data_dir)
+            handler = app.BinaryDataHandler(data_dir)
+        else:
+            handler = app.DataHandler(data_dir, journal=(backend == 'journal'))
+
+        rng = random.Random(1)
+        first_year = last_year - years + 1
+        mid_year = (first_year + last_year) // 2
+        clear_cache = getattr(handler, 'clear_cache', None)
+
+        def random_day():
+            return date(mid_year, 1, 1) + timedelta(days=rng.randint(0, 364))
+
+        results = {
+            'load_year_data_cold': time_call(lambda: handler.load_year_data(mid_year), repeat, setup=clear_cache),
+            'load_year_data_warm': time_call(lambda: handler.load_year_data(mid_year), repeat),
+            'get_data_for_date': time_call(lambda: handler.get_data_for_date(random_day()), repeat),
+            'save_data_for_date': time_call(
+                lambda: handler.save_data_for_date(random_day(), make_day(rng)), repeat),
+            'monthly_report_scan': time_call(
+                lambda: handler.load_columns(date(mid_year, 3, 1), date(mid_year, 3, 31)).summary(), repeat),
+            'yearly_report_scan': time_call(
+                lambda: handler.load_columns(date(mid_year, 1, 1), date(mid_year, 12, 31)).monthly_summaries(),
+                repeat),
+            'yearly_report': time_call(lambda: handler.year_summaries(mid_year), repeat),
+            'all_time_summary': time_call(
+                lambda: handler.summarize(date(first_year, 1, 1), date(last_year, 12, 31)), max(1, repeat // 4)),
+            'trends_all_time': time_call(
+                lambda: app.history_trends(handler, date(last_year, 12, 31)), max(1, repeat // 4)),
+        }
+        handler.close()
+        return results
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def run_suite(year_counts, backend, repeat):
+    return {
+        'meta': {
+            'backend': backend,
+            'repeat': repeat,
+            'numpy': app.load_numpy() is not None,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'datasets': {f"{years}y": run_dataset(years, backend, repeat) for years in year_counts},
+    }
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Returns (dataset, metric, baseline ms, current ms, ratio) for each regression."""
+    regressions = []
+    for dataset, metrics in current['datasets'].items():
+        for metric, stats in metrics.items():
+            before = baseline.get('datasets', {}).get(dataset, {}).get(metric)
+            if not before or not before['median_ms']:
+                continue
+            ratio = stats['median_ms'] / before['median_ms']
+            if ratio > 1 + threshold:
+                regressions.append((dataset, metric, before['median_ms'], stats['median_ms'], ratio))
+    return regressions
+
+
+def print_results(results):
+    for dataset, metrics in results['datasets'].items():
+        print(f"[{dataset}] ({results['meta']['backend']})")
+        for metric, stats in metrics.items():
+            print(f"  {metric:<22} median {stats['median_ms']:9.3f} ms   min {stats['min_ms']:9.3f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Habit & Finance Tracker storage and analysis code")
+    parser.add_argument('--years', type=int, nargs='+', default=list(DEFAULT_YEARS),
+                        help="Dataset sizes in years (default: 1 10 50)")
+    parser.add_argument('--backend', choices=['json', 'journal', 'sqlite', 'binary'], default='json')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Runs per measurement")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="Compare two result files instead of running benchmarks")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Allowed slowdown before a metric counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for dataset, metric, before, after, ratio in regressions:
+            print(f"REGRESSION [{dataset}] {metric}: {before:.3f} ms -> {after:.3f} ms ({ratio:.2f}x)")
+        print("No regressions found." if not regressions else f"{len(regressions)} regression(s) found.")
+        sys.exit(1 if regressions else 0)
+
+    results = run_suite(args.years, args.backend, args.repeat)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results written to {os.path.abspath(args.output)}.")
+
+
+if __name__ == "__main__":
+    main()
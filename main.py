@@ -1,14 +1,228 @@
+import time
+_PROCESS_STARTED = time.perf_counter() # Reference point for --startup-time
+
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+import argparse
+import bisect
+import calendar
+import csv
+import heapq
 import json
+import mmap
 import os
+import queue
+import re
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from datetime import datetime, date
 
+# NumPy is optional and slow to import, so it is only loaded by the analysis
+# engine on first use (see `load_numpy`). Without it, plain Python is used.
+np = None
+_numpy_checked = False
+
 # --- CONFIGURATION ---
 APP_TITLE = "Habit & Finance Tracker"
 GEOMETRY = "800x850"
 DATA_DIR = "data"
 FONT_FAMILY = "Segoe UI" # A modern, clean font available on Windows
+YEAR_CACHE_SIZE = 8 # Number of parsed year files kept in memory
+JOURNAL_MODE = False # Append saves to a per-year log instead of rewriting the year file
+JOURNAL_COMPACT_BYTES = 256 * 1024 # Fold the log into the year file once it grows past this
+STORAGE_BACKEND = "json" # "json" (one file per year), "sqlite" or "binary" (memory-mapped day rows)
+SQLITE_DB_NAME = "tracker.db"
+ROLLUPS_DIR_NAME = "rollups" # Precomputed monthly report totals for the JSON backend, one file per year
+NOTES_INDEX_DIR_NAME = "notes_index" # Per-year search index over notes, inside the data directory
+SEARCH_LIMIT = 100 # Most note search results shown, newest first
+SNIPPET_CHARS = 80
+TREND_WINDOWS = (7, 30, 90) # Moving average / rolling sum window sizes, in calendar days
+CHART_CACHE_SIZE = 32 # Downsampled chart series kept per (visible range, width)
+CHART_REDRAW_MS = 30 # Coalesce resize events before redrawing a chart
+REPORT_POLL_MS = 100 # How often the analysis window checks on a running range report
+LOAD_DEBOUNCE_MS = 250 # Wait this long after the last date change before loading
+WORKER_POLL_MS = 20 # How often Tk collects finished background storage calls
+AUTOSAVE_MODE = False # Save form edits in the background instead of with the Save button
+AUTOSAVE_DELAY_MS = 2000 # Autosaved edits are written at most this long after the first one
+METRICS_WINDOW = 500 # Latency samples kept per metric for the percentiles
+DIAGNOSTICS_REFRESH_MS = 1000
+TRACE_FILE_NAME = "trace.jsonl" # Optional per-event timing log, written to the data directory
+PROFILE_FILE_NAME = "profile.prof"
+
+# --- DATA FIELDS ---
+class Field:
+    """Schema entry for one tracked daily value.
+
+    `kind` is 'number' (a non-negative int or float), 'choice' (one of
+    `choices`) or 'text'. The form, validation, storage columns and reports
+    are all built from `SCHEMA`.
+    """
+    __slots__ = ('name', 'kind', 'label', 'unit', 'default', 'choices')
+
+    def __init__(self, name, kind, label, unit=None, default=None, choices=None):
+        self.name = name
+        self.kind = kind
+        self.label = label
+        self.unit = unit
+        self.default = default
+        self.choices = choices
+
+    @property
+    def form_label(self):
+        return f"{self.label} ({self.unit}):" if self.unit else f"{self.label}:"
+
+    def parse(self, raw):
+        """Returns the value to store for a raw input, or None if it is empty.
+
+        Raises ValueError with a user-facing message if the input is invalid.
+        """
+        if raw is None or raw == "":
+            return self.default
+        if self.kind == 'number':
+            try:
+                num_val = float(raw)
+                if num_val < 0 or num_val != num_val: # Also rejects NaN
+                    raise ValueError("Negative value")
+            except (TypeError, ValueError):
+                raise ValueError(f"Please enter a valid non-negative number for '{self.label}'.")
+            # Store as int if it's a whole number
+            return int(num_val) if num_val.is_integer() else num_val
+        if self.kind == 'choice':
+            for choice in self.choices:
+                if str(raw).strip().lower() == choice.lower():
+                    return choice
+            raise ValueError(f"'{self.label}' must be one of: {', '.join(self.choices)}.")
+        return raw
+
+
+# Every tracked field, in the order the form lists them
+SCHEMA = (
+    Field('morning_juice', 'choice', "Morning Juice", default="No", choices=("Yes", "No")),
+    Field('water_intake', 'number', "Water Intake", unit="L"),
+    Field('sleep_hours', 'number', "Sleep Hours"),
+    Field('self_improvement_time', 'number', "Self Improvement", unit="min"),
+    Field('education_time', 'number', "Education Time", unit="min"),
+    Field('github_commits', 'number', "GitHub Commits"),
+    Field('linkedin_posts', 'number', "LinkedIn Posts"),
+    Field('linkedin_engagement', 'number', "LinkedIn Time", unit="min"),
+    Field('facebook_posts', 'number', "Facebook Posts"),
+    Field('facebook_engagement', 'number', "Facebook Time", unit="min"),
+    Field('instagram_posts', 'number', "Instagram Posts"),
+    Field('instagram_engagement', 'number', "Instagram Time", unit="min"),
+    Field('money_earned', 'number', "Money Earned"),
+    Field('money_spent', 'number', "Money Spent"),
+    Field('notes', 'text', "Notes"),
+)
+FIELDS = {field.name: field for field in SCHEMA}
+TRACKED_FIELDS = tuple(field.name for field in SCHEMA)
+NUMERIC_FIELDS = tuple(field.name for field in SCHEMA if field.kind == 'number')
+TEXT_FIELDS = tuple(field.name for field in SCHEMA if field.kind != 'number')
+# Yes/No fields, reported as habits with streaks
+HABIT_FIELDS = tuple(field.name for field in SCHEMA if field.choices == ("Yes", "No"))
+
+# Report totals and the daily field each one sums up
+SUMMARY_FIELDS = {
+    'earned': 'money_earned',
+    'spent': 'money_spent',
+    'study_time': 'education_time',
+    'improvement_time': 'self_improvement_time',
+}
+# Report averages: each one keeps a '<key>_total' and a '<key>_days' count
+AVERAGE_FIELDS = {
+    'sleep': 'sleep_hours',
+    'water': 'water_intake',
+}
+# Report counts of the days each habit was done, one '<habit>_days' per Yes/No field
+HABIT_TOTALS = {f'{field}_days': field for field in HABIT_FIELDS}
+
+# --- INSTRUMENTATION ---
+class Metrics:
+    """Rolling latency samples and counters for the app's hot paths.
+
+    Each metric keeps its last `METRICS_WINDOW` durations (for p50/p95/max)
+    plus lifetime call and byte counts. Recording is thread-safe, since
+    storage calls run on the background worker. Events can also be appended
+    to a JSONL trace file.
+    """
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._calls = {}
+        self._bytes = {}
+        self._counters = {}
+        self._trace = None
+
+    def record(self, name, ms, nbytes=0):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(ms)
+            self._calls[name] = self._calls.get(name, 0) + 1
+            self._bytes[name] = self._bytes.get(name, 0) + nbytes
+            if self._trace is not None:
+                self._trace.write(json.dumps({'ts': time.time(), 'name': name, 'ms': round(ms, 3),
+                                              'bytes': nbytes}) + "\n")
+
+    @contextmanager
+    def timer(self, name, nbytes=0):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000, nbytes)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self):
+        """Returns ({metric: stats}, {counter: value}) with p50/p95/max in milliseconds."""
+        with self._lock:
+            timings = {}
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                timings[name] = {
+                    'calls': self._calls[name],
+                    'bytes': self._bytes[name],
+                    'p50': ordered[(len(ordered) - 1) // 2],
+                    'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    'max': ordered[-1],
+                }
+            return timings, dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._calls.clear()
+            self._bytes.clear()
+            self._counters.clear()
+
+    def start_trace(self, path):
+        with self._lock:
+            if self._trace is None:
+                self._trace = open(path, 'a', buffering=1)
+
+    def stop_trace(self):
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+    @property
+    def tracing(self):
+        return self._trace is not None
+
+
+metrics = Metrics()
+
 
 # --- STYLING ---
 # Using a dark theme inspired by modern productivity apps.......
@@ -24,8 +238,14 @@ class StyleManager:
     FONT_BOLD = (FONT_FAMILY, 11, "bold")
     FONT_TITLE = (FONT_FAMILY, 14, "bold")
 
+    _applied = False
+
     @staticmethod
     def apply_styles():
+        """Configures the ttk styles; only the first call per process does any work."""
+        if StyleManager._applied:
+            return
+        StyleManager._applied = True
         style = ttk.Style()
         style.theme_use('clam')
 
@@ -82,44 +302,2227 @@ class StyleManager:
                   background=[('readonly', StyleManager.COLOR_ENTRY_BG)],
                   fieldbackground=[('readonly', StyleManager.COLOR_ENTRY_BG)])
 
-class DataHandler:
-    """Handles loading and saving of tracking data."""
-    def __init__(self, data_dir):
+
+def validate_entry(values):
+    """Validates one day's raw values (form or import) and returns the record to store.
+
+    Each field is checked by its `Field.parse`; empty values are left out
+    unless the field has a default. Raises ValueError for the first invalid
+    field.
+    """
+    data = {}
+    for field in SCHEMA:
+        value = field.parse(values.get(field.name))
+        if value is not None:
+            data[field.name] = value
+    return data
+
+
+class DayRecord:
+    """One day's values, stored in slots generated from `SCHEMA`.
+
+    A plain dict per day repeats every key string and carries a hash table;
+    a slotted record is a fraction of the size, which matters when the year
+    cache holds decades of days. Records support the read-only dict methods
+    the rest of the app uses (`get`, `in`, `[]`, `items`), so they can be
+    passed anywhere a day's dict was. Missing values are None; keys outside
+    the schema are kept in `extra` so nothing is lost on a round trip.
+    """
+    __slots__ = TRACKED_FIELDS + ('extra',)
+
+    def __init__(self, **values):
+        extra = None
+        for name in TRACKED_FIELDS:
+            setattr(self, name, values.pop(name, None))
+        if values:
+            extra = values
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        return cls(**data) if isinstance(data, dict) else cls()
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in TRACKED_FIELDS if getattr(self, name) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def items(self):
+        for name in TRACKED_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                yield name, value
+        if self.extra:
+            yield from self.extra.items()
+
+    def keys(self):
+        return [name for name, _ in self.items()]
+
+    def get(self, key, default=None):
+        if key in FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return sum(1 for _ in self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (DayRecord, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, DayRecord) else other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"DayRecord({self.to_dict()!r})"
+
+
+def new_summary():
+    """Returns an empty set of report totals."""
+    summary = {key: 0 for key in SUMMARY_FIELDS}
+    for key in AVERAGE_FIELDS:
+        summary[f'{key}_total'] = 0
+        summary[f'{key}_days'] = 0
+    for key in HABIT_TOTALS:
+        summary[key] = 0
+    summary['entries'] = 0
+    return summary
+
+
+def add_to_summary(summary, data, sign=1):
+    """Adds one day's entry to a set of report totals (or removes it, with sign=-1)."""
+    summary['entries'] += sign
+    for key, field in SUMMARY_FIELDS.items():
+        summary[key] += sign * data.get(field, 0)
+    for key, field in AVERAGE_FIELDS.items():
+        if field in data:
+            summary[f'{key}_total'] += sign * data[field]
+            summary[f'{key}_days'] += sign
+    for key, field in HABIT_TOTALS.items():
+        if data.get(field) == 'Yes':
+            summary[key] += sign
+
+
+def merge_summaries(summaries):
+    """Adds several sets of report totals together."""
+    merged = new_summary()
+    for summary in summaries:
+        for key in merged:
+            merged[key] += summary.get(key, 0)
+    return merged
+
+
+class StorageBackend:
+    """Interface shared by the storage backends.
+
+    Backends store one `DayRecord` per day, keyed by a 'YYYY-MM-DD' string,
+    and accept either records or plain dicts when saving. Only
+    the per-record methods are required; `save_many` and `summarize` have
+    generic implementations that backends can replace with faster ones.
+    """
+    name = None # Key used by `create_data_handler`
+
+    def available_years(self):
+        raise NotImplementedError
+
+    def load_year_data(self, year):
+        raise NotImplementedError
+
+    def get_data_for_date(self, selected_date):
+        raise NotImplementedError
+
+    def save_data_for_date(self, selected_date, data):
+        raise NotImplementedError
+
+    def save_many(self, records):
+        """Saves an iterable of (date, data) pairs."""
+        for selected_date, data in records:
+            self.save_data_for_date(selected_date, data)
+
+    def iter_days(self, start_date, end_date):
+        """Yields (date_key, data) for the entries between two dates, inclusive, in date order.
+
+        Year data is read one year at a time and never copied; only the keys in
+        range are sorted.
+        """
+        start_key, end_key = start_date.isoformat(), end_date.isoformat()
+        for year in range(start_date.year, end_date.year + 1):
+            year_data = self.load_year_data(year)
+            for date_key in sorted(k for k in year_data if start_key <= k <= end_key):
+                yield date_key, year_data[date_key]
+
+    def query(self, start_date, end_date, fields=None):
+        """Returns an iterator of (date_key, data) for the entries between two dates, inclusive.
+
+        Works like `iter_days`; with `fields`, each data is a dict holding only
+        those fields (missing ones are left out). Raises ValueError for
+        unknown field names before anything is read.
+        """
+        if fields is None:
+            return self.iter_days(start_date, end_date)
+        fields = tuple(fields)
+        unknown = [field for field in fields if field not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        return ((date_key, {field: data[field] for field in fields if field in data})
+                for date_key, data in self.iter_days(start_date, end_date))
+
+    def load_columns(self, start_date, end_date):
+        """Returns the entries between two dates, inclusive, as `ColumnarData`."""
+        return ColumnarData.from_items(self.iter_days(start_date, end_date))
+
+    def search_notes(self, query, limit=SEARCH_LIMIT):
+        """Returns (date_key, snippet) for notes with every word of `query`, newest first.
+
+        This generic version scans every note; backends with an index replace it.
+        """
+        terms = tokenize(query)
+        years = self.available_years()
+        if not terms or not years:
+            return []
+        hits = [(date_key, data['notes'])
+                for date_key, data in self.query(date(years[0], 1, 1), date(years[-1], 12, 31), ['notes'])
+                if data.get('notes') and note_matches(data['notes'], terms)]
+        return [(date_key, note_snippet(text, terms)) for date_key, text in reversed(hits[-limit:])]
+
+    def summarize(self, start_date, end_date):
+        """Returns report totals for the entries between two dates, inclusive."""
+        return self.load_columns(start_date, end_date).summary()
+
+    def year_summaries(self, year):
+        """Returns report totals per month (1-12) of a year, for months with entries."""
+        return self.load_columns(date(year, 1, 1), date(year, 12, 31)).monthly_summaries()
+
+    def close(self):
+        pass
+
+
+class RollupStore:
+    """Precomputed report totals per (year, month), persisted as one JSON file per year.
+
+    Each year's totals are stored with the signature of the year's files at the
+    time they were computed. If the files have changed since (for example they
+    were edited by hand), the totals no longer count and the caller rebuilds
+    them from a full scan. `save` only rewrites the years changed since the
+    last save.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self._years = {} # year -> {'signature', 'months'} or None, read on first use
+        self._dirty = set()
+
+    def _path(self, year):
+        return os.path.join(self.directory, f"{year}.json")
+
+    @staticmethod
+    def _signature_key(signature):
+        # Signatures are nested tuples; JSON hands them back as lists
+        return json.loads(json.dumps(signature))
+
+    def _entry(self, year):
+        if year not in self._years:
+            try:
+                with open(self._path(year), 'r') as f:
+                    raw = json.load(f)
+                entry = {
+                    'signature': raw['signature'],
+                    'months': {int(month): summary for month, summary in raw['months'].items()},
+                }
+            except (OSError, json.JSONDecodeError, KeyError, AttributeError, ValueError):
+                entry = None
+            if entry is not None and any(summary.keys() != new_summary().keys()
+                                         for summary in entry['months'].values()):
+                entry = None # Written for a different set of report totals
+            self._years[year] = entry
+        return self._years[year]
+
+    def stored_years(self):
+        """Years that have a totals file, whether or not they are current."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(int(match.group(1)) for match in
+                      (re.fullmatch(r'(\d{4})\.json', name) for name in os.listdir(self.directory)) if match)
+
+    def save(self):
+        """Writes the years changed since the last save, and removes discarded ones."""
+        for year in sorted(self._dirty):
+            entry = self._years.get(year)
+            path = self._path(year)
+            if entry is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                # dumps() uses the C encoder; dump() to a file streams through the Python one
+                f.write(json.dumps(entry, separators=(',', ':')))
+            os.replace(tmp_path, path)
+        self._dirty.clear()
+
+    def get(self, year, signature):
+        """Returns the monthly totals of a year, or None if they are out of date."""
+        entry = self._entry(year)
+        if entry is None or entry['signature'] != self._signature_key(signature):
+            return None
+        return entry['months']
+
+    def set_year(self, year, signature, months):
+        self._years[year] = {'signature': self._signature_key(signature), 'months': months}
+        self._dirty.add(year)
+
+    def discard_year(self, year):
+        self._years[year] = None
+        self._dirty.add(year)
+
+    def clear(self):
+        for year in set(self.stored_years()) | set(self._years):
+            self.discard_year(year)
+
+    def update_days(self, year, old_signature, new_signature, changes):
+        """Applies (month, old data, new data) changes to a year's totals.
+
+        Returns False if the stored totals were already out of date, in which
+        case nothing is changed.
+        """
+        months = self.get(year, old_signature)
+        if months is None:
+            return False
+        for month, old, new in changes:
+            summary = months.setdefault(month, new_summary())
+            if old:
+                add_to_summary(summary, old, sign=-1)
+            add_to_summary(summary, new)
+            for key, value in summary.items():
+                # Keep repeated float additions and subtractions from drifting
+                summary[key] = _as_number(round(value, 6))
+            if not summary['entries']:
+                del months[month]
+        self._years[year]['signature'] = self._signature_key(new_signature)
+        self._dirty.add(year)
+        return True
+
+
+def tokenize(text):
+    """Splits text into lowercase words, in order."""
+    return re.findall(r"\w+", str(text).lower())
+
+
+def note_matches(text, terms):
+    """True if a note contains every term; the last one may be a word prefix."""
+    words = set(tokenize(text))
+    if any(term not in words for term in terms[:-1]):
+        return False
+    return any(word.startswith(terms[-1]) for word in words)
+
+
+def note_snippet(text, terms, width=SNIPPET_CHARS):
+    """Returns about `width` characters of a note around its first matching term."""
+    text = " ".join(str(text).split())
+    lower = text.lower()
+    positions = [pos for pos in (lower.find(term) for term in terms) if pos >= 0]
+    start = max(min(positions, default=0) - width // 3, 0)
+    end = min(start + width, len(text))
+    return ("..." if start else "") + text[start:end] + ("..." if end < len(text) else "")
+
+
+class NotesIndex:
+    """Inverted index from the words in notes to the dates they appear on.
+
+    Stored as one JSON file per year, holding the signature of the year's files
+    it was built from, the year's notes (for snippets) and its postings (word
+    -> dates). Saves patch a single year in memory and append the changed
+    notes to `<year>.log.jsonl`, which is replayed on load and folded into the
+    year file once it grows past `compact_bytes`, like the data journal. A year
+    whose files have changed outside the app no longer matches its signature
+    and is rebuilt by the caller, like `RollupStore`. The first search merges
+    every year's postings into word -> set of dates in memory, and later saves
+    keep that up to date.
+    """
+    def __init__(self, directory, compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.directory = directory
+        self.compact_bytes = compact_bytes
+        self._years = {} # year -> {'signature', 'notes', 'postings'} or None, read on first use
+        self._postings = None # word -> set of date keys, built on the first search
+        self._words = None # Sorted words of `_postings`, for prefix matches
+
+    def _path(self, year):
+        return os.path.join(self.directory, f"{year}.json")
+
+    def _log_path(self, year):
+        return os.path.join(self.directory, f"{year}.log.jsonl")
+
+    @staticmethod
+    def _year_postings(notes):
+        postings = {}
+        for date_key, text in notes.items():
+            for word in set(tokenize(text)):
+                postings.setdefault(word, []).append(date_key)
+        return {word: sorted(dates) for word, dates in postings.items()}
+
+    def _entry(self, year):
+        if year not in self._years:
+            try:
+                with open(self._path(year), 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+                entry = {'signature': raw['signature'], 'notes': raw['notes'], 'postings': raw['postings']}
+            except (OSError, json.JSONDecodeError, KeyError, TypeError):
+                entry = None
+            if entry is not None:
+                self._replay_log(year, entry)
+            self._years[year] = entry
+            if entry is not None and self._postings is not None:
+                self._merge(entry)
+        return self._years[year]
+
+    def _merge(self, entry):
+        for word, dates in entry['postings'].items():
+            if word not in self._postings:
+                self._postings[word] = set()
+                self._words = None
+            self._postings[word].update(dates)
+
+    def _post(self, entry, date_key, text, add=True):
+        """Adds a date to (or removes it from) the postings of every word of a note."""
+        year_postings = entry['postings']
+        for word in set(tokenize(text)):
+            if add:
+                dates = year_postings.setdefault(word, [])
+                i = bisect.bisect_left(dates, date_key)
+                if i == len(dates) or dates[i] != date_key:
+                    dates.insert(i, date_key)
+                if self._postings is not None:
+                    if word not in self._postings:
+                        self._postings[word] = set()
+                        self._words = None
+                    self._postings[word].add(date_key)
+            else:
+                dates = year_postings.get(word, [])
+                i = bisect.bisect_left(dates, date_key)
+                if i < len(dates) and dates[i] == date_key:
+                    del dates[i]
+                    if not dates:
+                        del year_postings[word]
+                if self._postings is not None and word in self._postings:
+                    self._postings[word].discard(date_key)
+
+    def _apply(self, entry, changes):
+        """Applies (date_key, old note, new note) changes to a year's notes and postings."""
+        for date_key, old, new in changes:
+            if old == new:
+                continue
+            if old:
+                entry['notes'].pop(date_key, None)
+                self._post(entry, date_key, old, add=False)
+            if new:
+                entry['notes'][date_key] = new
+                self._post(entry, date_key, new)
+
+    def _replay_log(self, year, entry):
+        """Replays a year's log over its index file.
+
+        Each record holds the new notes of the changed dates and the year's
+        signature after the change. Replaying records the index file already
+        contains gives the same result, so a crash while compacting is
+        harmless. A torn last record is ignored; the signature then doesn't
+        match and the caller rebuilds the year.
+        """
+        try:
+            with open(self._log_path(year), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    self._apply(entry, [(date_key, entry['notes'].get(date_key), note)
+                                        for date_key, note in record['notes']])
+                    entry['signature'] = record['signature']
+        except FileNotFoundError:
+            pass
+
+    def _write(self, year):
+        """Writes a year's whole index file and drops its log."""
+        entry = self._years[year]
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._path(year) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(entry, separators=(',', ':')))
+        os.replace(tmp_path, self._path(year))
+        if os.path.exists(self._log_path(year)):
+            os.remove(self._log_path(year))
+
+    def _append_log(self, year, changes):
+        entry = self._years[year]
+        record = json.dumps({'signature': entry['signature'],
+                             'notes': [[date_key, new] for date_key, old, new in changes if old != new]},
+                            separators=(',', ':'))
+        with open(self._log_path(year), 'a', encoding='utf-8') as f:
+            f.write(record + "\n")
+            size = f.tell()
+        if size >= self.compact_bytes:
+            self._write(year)
+
+    def is_current(self, year, signature):
+        entry = self._entry(year)
+        return entry is not None and entry['signature'] == RollupStore._signature_key(signature)
+
+    def indexed_years(self):
+        """Years that have an index file, whether or not they are current."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(int(match.group(1)) for match in
+                      (re.fullmatch(r'(\d{4})\.json', name) for name in os.listdir(self.directory)) if match)
+
+    def set_year(self, year, signature, notes):
+        """Replaces a year's notes ({date_key: text}) and writes its index file."""
+        old = self._entry(year)
+        if old is not None and self._postings is not None:
+            for word, dates in old['postings'].items():
+                self._postings[word].difference_update(dates)
+        entry = {'signature': RollupStore._signature_key(signature), 'notes': dict(notes),
+                 'postings': self._year_postings(notes)}
+        self._years[year] = entry
+        if self._postings is not None:
+            self._merge(entry)
+        self._write(year)
+
+    def update_days(self, year, old_signature, new_signature, changes):
+        """Applies (date_key, old note, new note) changes to a year.
+
+        Returns False if the year's index was already out of date, in which
+        case nothing is changed.
+        """
+        if not self.is_current(year, old_signature):
+            return False
+        self._apply(self._years[year], changes)
+        self._years[year]['signature'] = RollupStore._signature_key(new_signature)
+        self._append_log(year, changes)
+        return True
+
+    def discard_year(self, year):
+        entry = self._entry(year)
+        if entry is not None and self._postings is not None:
+            for word, dates in entry['postings'].items():
+                self._postings[word].difference_update(dates)
+        self._years[year] = None
+        for path in (self._log_path(year), self._path(year)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def sync(self, years, signature_of, notes_of):
+        """Drops the index of years no longer stored and reindexes years changed outside the app.
+
+        `signature_of(year)` and `notes_of(year)` ({date_key: text}) come from the backend.
+        """
+        for year in self.indexed_years():
+            if year not in years: # The year file was deleted
+                self.discard_year(year)
+        for year in years:
+            signature = signature_of(year)
+            if not self.is_current(year, signature):
+                self.set_year(year, signature, notes_of(year))
+
+    def search(self, query, years, limit=SEARCH_LIMIT):
+        """Returns (date_key, snippet) for notes with every word of `query`, newest first.
+
+        The last word also matches as a prefix, so results can follow typing.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        if self._postings is None:
+            self._postings = {}
+            for year in years:
+                entry = self._entry(year)
+                if entry is not None:
+                    self._merge(entry)
+        if self._words is None:
+            self._words = sorted(self._postings)
+        matches = None
+        for term in terms[:-1]:
+            dates = self._postings.get(term, ())
+            matches = set(dates) if matches is None else matches & dates
+        prefix = terms[-1]
+        last = set()
+        for word in self._words[bisect.bisect_left(self._words, prefix):]:
+            if not word.startswith(prefix):
+                break
+            last |= self._postings[word]
+        matches = last if matches is None else matches & last
+        hits = heapq.nlargest(limit, matches)
+        return [(date_key, note_snippet(self._years[int(date_key[:4])]['notes'].get(date_key, ""), terms))
+                for date_key in hits]
+
+
+class DataHandler(StorageBackend):
+    """Handles loading and saving of tracking data.
+
+    Parsed year files are kept in a small LRU cache. Each entry remembers the
+    file's mtime and size, so edits made outside the app are picked up on the
+    next read. The dicts returned by `load_year_data` are shared with the cache
+    and must be treated as read-only by callers.
+
+    In journal mode a save appends one record to `<year>.jsonl` instead of
+    rewriting `<year>.json`. Reads replay the journal over the snapshot, and the
+    journal is compacted into a new snapshot once it gets too large.
+
+    Monthly report totals are kept in a `RollupStore` and updated on every
+    save, so reports don't need to rescan the year files; the same goes for the
+    `NotesIndex` used by note search. Each cached year
+    also gets a sorted list of its date keys, so range reads bisect straight
+    to the first day in range instead of filtering the whole year.
+    """
+    name = "json"
+
+    def __init__(self, data_dir, cache_size=YEAR_CACHE_SIZE, journal=JOURNAL_MODE,
+                 compact_bytes=JOURNAL_COMPACT_BYTES):
         self.data_dir = data_dir
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict() # year -> (file signature, year data)
+        self._date_index = {} # year -> (file signature, sorted date keys), for cached years
+        self.journal = journal
+        self.compact_bytes = compact_bytes
+        self.rollups = RollupStore(os.path.join(self.data_dir, ROLLUPS_DIR_NAME))
+        self.notes_index = NotesIndex(os.path.join(self.data_dir, NOTES_INDEX_DIR_NAME), compact_bytes)
 
     def _get_filepath(self, year):
         return os.path.join(self.data_dir, f"{year}.json")
 
-    def load_year_data(self, year):
-        filepath = self._get_filepath(year)
-        if os.path.exists(filepath):
-            with open(filepath, 'r') as f:
+    def available_years(self):
+        years = set()
+        for filename in os.listdir(self.data_dir):
+            match = re.fullmatch(r'(\d{4})\.jsonl?', filename)
+            if match:
+                years.add(int(match.group(1)))
+        return sorted(years)
+
+    def _get_journal_path(self, year):
+        return os.path.join(self.data_dir, f"{year}.jsonl")
+
+    def _file_signature(self, filepath):
+        """Returns (mtime, size) for a file, or None if it doesn't exist."""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _year_signature(self, year):
+        return (self._file_signature(self._get_filepath(year)),
+                self._file_signature(self._get_journal_path(year)))
+
+    def _read_year_file(self, filepath):
+        started = time.perf_counter()
+        with open(filepath, 'r') as f:
+            text = f.read()
+        metrics.record('storage.read', (time.perf_counter() - started) * 1000, len(text))
+        with metrics.timer('storage.parse', len(text)):
+            try:
+                raw = json.loads(text)
+            except json.JSONDecodeError:
+                return {} # Handle corrupted file
+            if not isinstance(raw, dict):
+                return {}
+            return {date_key: DayRecord.from_dict(data) for date_key, data in raw.items()}
+
+    def _replay_journal(self, journal_path, year_data):
+        """Applies journal records on top of the snapshot data, in order."""
+        with open(journal_path, 'r') as f:
+            for line in f:
                 try:
-                    return json.load(f)
-                except json.JSONDecodeError:
-                    return {} # Handle corrupted file
-        return {}
+                    record = json.loads(line)
+                    year_data[record['date']] = DayRecord.from_dict(record['data'])
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue # Skip a torn last line left by a crash
+
+    def _write_snapshot(self, year, year_data):
+        """Atomically replaces the year file via a temp file and rename."""
+        filepath = self._get_filepath(year)
+        tmp_path = filepath + ".tmp"
+        with metrics.timer('storage.serialize'):
+            text = json.dumps({date_key: data.to_dict() for date_key, data in year_data.items()}, indent=4)
+        with metrics.timer('storage.write', len(text)):
+            with open(tmp_path, 'w') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+
+    def _remember(self, year, signature, year_data):
+        """Stores a year in the cache, evicting the least recently used ones."""
+        self._cache[year] = (signature, year_data)
+        self._cache.move_to_end(year)
+        while len(self._cache) > self.cache_size:
+            evicted, _ = self._cache.popitem(last=False)
+            self._date_index.pop(evicted, None)
+
+    def load_year_data(self, year):
+        signature = self._year_signature(year)
+        cached = self._cache.get(year)
+        if cached is not None and cached[0] == signature:
+            self._cache.move_to_end(year)
+            self.cache_hits += 1
+            metrics.count('cache.hits')
+            return cached[1]
+
+        self.cache_misses += 1
+        metrics.count('cache.misses')
+        snapshot_sig, journal_sig = signature
+        year_data = self._read_year_file(self._get_filepath(year)) if snapshot_sig is not None else {}
+        if journal_sig is not None:
+            self._replay_journal(self._get_journal_path(year), year_data)
+        self._remember(year, signature, year_data)
+        return year_data
 
     def get_data_for_date(self, selected_date):
         year_data = self.load_year_data(selected_date.year)
-        return year_data.get(selected_date.strftime('%Y-%m-%d'), {})
+        return year_data.get(selected_date.strftime('%Y-%m-%d')) or DayRecord()
+
+    def _sorted_keys(self, year):
+        """Returns (year data, its date keys in order), sorting only when the year has changed."""
+        year_data = self.load_year_data(year)
+        cached = self._cache.get(year)
+        if cached is None: # Cache disabled
+            return year_data, sorted(year_data)
+        index = self._date_index.get(year)
+        if index is None or index[0] != cached[0]:
+            with metrics.timer('storage.index', len(year_data)):
+                index = (cached[0], sorted(year_data))
+            self._date_index[year] = index
+        return year_data, index[1]
+
+    def _update_index(self, year, old_signature, new_signature, date_keys):
+        """Inserts newly saved dates into an up-to-date index instead of re-sorting the year."""
+        index = self._date_index.get(year)
+        if index is None or index[0] != old_signature:
+            return
+        keys = index[1]
+        for date_key in date_keys:
+            i = bisect.bisect_left(keys, date_key)
+            if i == len(keys) or keys[i] != date_key:
+                keys.insert(i, date_key)
+        self._date_index[year] = (new_signature, keys)
+
+    def iter_days(self, start_date, end_date):
+        """Yields (date_key, data) for the entries between two dates, inclusive, in date order.
+
+        Only years that have files are read, and each year's index is bisected
+        so the cost is proportional to the entries in range.
+        """
+        start_key, end_key = start_date.isoformat(), end_date.isoformat()
+        for year in self.available_years():
+            if not start_date.year <= year <= end_date.year:
+                continue
+            year_data, keys = self._sorted_keys(year)
+            in_range = keys[bisect.bisect_left(keys, start_key):bisect.bisect_right(keys, end_key)]
+            for date_key in in_range:
+                yield date_key, year_data[date_key]
 
     def save_data_for_date(self, selected_date, data):
+        if self.journal:
+            self._append_to_journal(selected_date, data)
+            return
+        self.save_many([(selected_date, data)])
+
+    def save_many(self, records):
+        """Saves many days, rewriting each affected year file only once."""
+        by_year = {}
+        for selected_date, data in records:
+            by_year.setdefault(selected_date.year, {})[selected_date.strftime('%Y-%m-%d')] = DayRecord.from_dict(data)
+        for year, entries in by_year.items():
+            old_signature = self._year_signature(year)
+            # Copy so the cached dict is left untouched if the write fails
+            year_data = dict(self.load_year_data(year))
+            changes = [(int(date_key[5:7]), year_data.get(date_key), data)
+                       for date_key, data in entries.items()]
+            note_changes = [(date_key, (year_data.get(date_key) or {}).get('notes'), data.get('notes'))
+                            for date_key, data in entries.items()]
+            year_data.update(entries)
+            try:
+                self._write_snapshot(year, year_data)
+                # The snapshot now contains everything the journal had
+                if os.path.exists(self._get_journal_path(year)):
+                    os.remove(self._get_journal_path(year))
+            except OSError:
+                self._cache.pop(year, None)
+                raise
+            new_signature = self._year_signature(year)
+            self._remember(year, new_signature, year_data)
+            self._update_index(year, old_signature, new_signature, entries)
+            self._update_rollups(year, old_signature, new_signature, changes, year_data)
+            self._update_notes_index(year, old_signature, new_signature, note_changes, year_data)
+
+    def _append_to_journal(self, selected_date, data):
+        """Appends one compact record and fsyncs it, without reading the year."""
         year = selected_date.year
-        year_data = self.load_year_data(year)
         date_key = selected_date.strftime('%Y-%m-%d')
-        year_data[date_key] = data
+        journal_path = self._get_journal_path(year)
+        old_signature = self._year_signature(year)
+        cached = self._cache.get(year)
+        cache_fresh = cached is not None and cached[0] == old_signature
+
+        data = DayRecord.from_dict(data)
+        record = json.dumps({'date': date_key, 'data': data.to_dict()}, separators=(',', ':'))
+        try:
+            with metrics.timer('storage.journal_append', len(record) + 1):
+                with open(journal_path, 'a') as f:
+                    f.write(record + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError:
+            self._cache.pop(year, None)
+            raise
+
+        new_signature = self._year_signature(year)
+        if cache_fresh:
+            old = cached[1].get(date_key)
+            cached[1][date_key] = data
+            self._remember(year, new_signature, cached[1])
+            self._update_index(year, old_signature, new_signature, [date_key])
+            self._update_rollups(year, old_signature, new_signature,
+                                 [(selected_date.month, old, data)], cached[1])
+            self._update_notes_index(year, old_signature, new_signature,
+                                     [(date_key, (old or {}).get('notes'), data.get('notes'))], cached[1])
+        else:
+            # Without the previous record the totals can't be patched
+            self._cache.pop(year, None)
+            self.rollups.discard_year(year)
+            self.rollups.save()
+            self.notes_index.discard_year(year)
+
+        if os.path.getsize(journal_path) >= self.compact_bytes:
+            self.compact_year(year)
+
+    def compact_year(self, year):
+        """Folds the year's journal into a fresh snapshot and removes the journal.
+
+        Replaying a journal over a snapshot that already contains it gives the
+        same result, so a crash between the rename and the removal is harmless.
+        """
+        journal_path = self._get_journal_path(year)
+        if not os.path.exists(journal_path):
+            return
+        old_signature = self._year_signature(year)
+        year_data = self.load_year_data(year)
+        self._write_snapshot(year, year_data)
+        os.remove(journal_path)
+        new_signature = self._year_signature(year)
+        self._remember(year, new_signature, year_data)
+        self._update_rollups(year, old_signature, new_signature, [], year_data)
+        self._update_notes_index(year, old_signature, new_signature, [], year_data)
+
+    def cache_stats(self):
+        """Returns the cache counters, e.g. for diagnostics."""
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'cached_years': list(self._cache.keys()),
+        }
+
+    def clear_cache(self):
+        self._cache.clear()
+        self._date_index.clear()
+
+    def _update_rollups(self, year, old_signature, new_signature, changes, year_data):
+        """Patches a year's monthly totals, or recomputes them from the data in memory."""
+        if not self.rollups.update_days(year, old_signature, new_signature, changes):
+            months = ColumnarData.from_items(year_data.items()).monthly_summaries()
+            self.rollups.set_year(year, new_signature, months)
+        self.rollups.save()
+
+    def _update_notes_index(self, year, old_signature, new_signature, changes, year_data):
+        """Patches a year's note index, or reindexes it from the data in memory."""
+        if not self.notes_index.update_days(year, old_signature, new_signature, changes):
+            self.notes_index.set_year(year, new_signature, self._year_notes(year_data))
+
+    @staticmethod
+    def _year_notes(year_data):
+        return {date_key: data['notes'] for date_key, data in year_data.items() if data.get('notes')}
+
+    def rebuild_notes_index(self):
+        """Reindexes the notes of every year. Returns the number of notes indexed."""
+        years = self.available_years()
+        for year in self.notes_index.indexed_years():
+            if year not in years:
+                self.notes_index.discard_year(year)
+        count = 0
+        for year in years:
+            signature = self._year_signature(year)
+            notes = self._year_notes(self.load_year_data(year))
+            self.notes_index.set_year(year, signature, notes)
+            count += len(notes)
+        return count
+
+    def search_notes(self, query, limit=SEARCH_LIMIT):
+        """Answers from the notes index, reindexing only years changed outside the app."""
+        years = self.available_years()
+        with metrics.timer('search.notes'):
+            self.notes_index.sync(years, self._year_signature,
+                                  lambda year: self._year_notes(self.load_year_data(year)))
+            return self.notes_index.search(query, years, limit)
+
+    def summarize(self, start_date, end_date):
+        # Whole months of a single year can be answered from up-to-date rollups
+        month_aligned = (start_date.year == end_date.year and start_date.day == 1
+                         and end_date.day == calendar.monthrange(end_date.year, end_date.month)[1])
+        if month_aligned:
+            months = self.rollups.get(start_date.year, self._year_signature(start_date.year))
+            if months is not None:
+                return merge_summaries(summary for month, summary in months.items()
+                                       if start_date.month <= month <= end_date.month)
+        return super().summarize(start_date, end_date)
+
+    def year_summaries(self, year):
+        signature = self._year_signature(year)
+        months = self.rollups.get(year, signature)
+        if months is None:
+            months = self.rebuild_rollups(year)
+        return months
+
+    def rebuild_rollups(self, year=None):
+        """Recomputes the monthly totals of one year, or of every year if None."""
+        years = [year] if year is not None else self.available_years()
+        if year is None:
+            self.rollups.clear()
+            # Older versions kept every year's totals in a single file
+            legacy_path = os.path.join(self.data_dir, "rollups.json")
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
+        months = {}
+        for y in years:
+            signature = self._year_signature(y)
+            months = ColumnarData.from_items(self.load_year_data(y).items()).monthly_summaries()
+            if signature != (None, None):
+                self.rollups.set_year(y, signature, months)
+        self.rollups.save()
+        return months
+
+    def check_rollups(self):
+        """Compares the stored monthly totals against a full scan of every year.
+
+        Returns a list of (year, month, stored, scanned) tuples for each month
+        that doesn't match; stale years are reported with stored=None.
+        """
+        mismatches = []
+        for year in self.available_years():
+            stored = self.rollups.get(year, self._year_signature(year))
+            scanned = ColumnarData.from_items(self.load_year_data(year).items()).monthly_summaries()
+            if stored is None:
+                mismatches.append((year, None, None, scanned))
+                continue
+            for month in sorted(set(stored) | set(scanned)):
+                a, b = stored.get(month, new_summary()), scanned.get(month, new_summary())
+                if any(abs(a[key] - b[key]) > 1e-6 for key in a):
+                    mismatches.append((year, month, a, b))
+        return mismatches
+
+
+class SqliteDataHandler(StorageBackend):
+    """Stores all days in a single SQLite table, clustered by date.
+
+    Lookups and report totals are range queries on the primary key, so they
+    don't depend on how many years of history the database holds. The
+    connection may be shared between threads; a lock serializes its use.
+
+    If SQLite has FTS5, notes are also kept in a full-text table, keyed by
+    the date as YYYYMMDD and maintained by triggers on `days`, which note
+    search queries instead of scanning every note.
+    """
+    name = "sqlite"
+
+    def __init__(self, data_dir, db_name=SQLITE_DB_NAME):
+        self.data_dir = data_dir
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        self.db_path = os.path.join(self.data_dir, db_name)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(
+            [f"{field} NUMERIC" for field in NUMERIC_FIELDS]
+            + [f"{field} TEXT" for field in TEXT_FIELDS]
+        )
+        with self.conn:
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS days (date TEXT PRIMARY KEY, {columns}, extra TEXT) WITHOUT ROWID"
+            )
+        self._columns = NUMERIC_FIELDS + TEXT_FIELDS
+        self.has_fts = self._create_notes_fts()
+        placeholders = ", ".join("?" for _ in range(len(self._columns) + 2))
+        self._insert_sql = f"INSERT OR REPLACE INTO days (date, {', '.join(self._columns)}, extra) VALUES ({placeholders})"
+        self._select_sql = f"SELECT date, {', '.join(self._columns)}, extra FROM days"
+
+    def _create_notes_fts(self):
+        """Creates (and fills, the first time) the notes full-text table; False without FTS5."""
+        fts_key = "CAST(replace({}.date, '-', '') AS INTEGER)"
+        with self._lock, self.conn:
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notes_fts'").fetchone()
+            if not exists:
+                try:
+                    self.conn.execute("CREATE VIRTUAL TABLE notes_fts USING fts5("
+                                      "notes, tokenize=\"unicode61 remove_diacritics 0 tokenchars '_'\")")
+                except sqlite3.OperationalError:
+                    return False # SQLite was built without FTS5
+                self.conn.execute(f"INSERT INTO notes_fts (rowid, notes) SELECT {fts_key.format('days')}, notes "
+                                  "FROM days WHERE notes IS NOT NULL AND notes != ''")
+            # INSERT OR REPLACE doesn't fire delete triggers, so inserts clear the old row first
+            self.conn.executescript(f"""
+                CREATE TRIGGER IF NOT EXISTS days_notes_before_insert BEFORE INSERT ON days BEGIN
+                    DELETE FROM notes_fts WHERE rowid = {fts_key.format('NEW')};
+                END;
+                CREATE TRIGGER IF NOT EXISTS days_notes_after_insert AFTER INSERT ON days
+                WHEN NEW.notes IS NOT NULL AND NEW.notes != '' BEGIN
+                    INSERT INTO notes_fts (rowid, notes) VALUES ({fts_key.format('NEW')}, NEW.notes);
+                END;
+                CREATE TRIGGER IF NOT EXISTS days_notes_after_update AFTER UPDATE OF notes ON days BEGIN
+                    DELETE FROM notes_fts WHERE rowid = {fts_key.format('OLD')};
+                    INSERT INTO notes_fts (rowid, notes) SELECT {fts_key.format('NEW')}, NEW.notes
+                    WHERE NEW.notes IS NOT NULL AND NEW.notes != '';
+                END;
+                CREATE TRIGGER IF NOT EXISTS days_notes_after_delete AFTER DELETE ON days BEGIN
+                    DELETE FROM notes_fts WHERE rowid = {fts_key.format('OLD')};
+                END;
+            """)
+        return True
+
+    def search_notes(self, query, limit=SEARCH_LIMIT):
+        """Answers from the notes full-text table, or scans every note without FTS5."""
+        if not self.has_fts:
+            return super().search_notes(query, limit)
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Every word must match; the last one also as a prefix, so results follow typing
+        match = " ".join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+        with metrics.timer('search.notes'):
+            rows = self._query("SELECT rowid, notes FROM notes_fts WHERE notes_fts MATCH ? "
+                               "ORDER BY rowid DESC LIMIT ?", (match, limit))
+        return [(f"{key // 10000:04d}-{key // 100 % 100:02d}-{key % 100:02d}", note_snippet(text, terms))
+                for key, text in rows]
+
+    def _to_row(self, date_key, data):
+        extra = {key: value for key, value in data.items() if key not in self._columns}
+        return (date_key, *(data.get(field) for field in self._columns),
+                json.dumps(extra) if extra else None)
+
+    def _query(self, sql, params=()):
+        with self._lock, metrics.timer('storage.query'):
+            return self.conn.execute(sql, params).fetchall()
+
+    def _from_row(self, row):
+        data = {field: value for field, value in zip(self._columns, row[1:]) if value is not None}
+        if row[-1]:
+            data.update(json.loads(row[-1]))
+        return DayRecord(**data)
+
+    def available_years(self):
+        rows = self._query("SELECT DISTINCT substr(date, 1, 4) FROM days ORDER BY 1")
+        return [int(row[0]) for row in rows]
+
+    def load_year_data(self, year):
+        rows = self._query(f"{self._select_sql} WHERE date BETWEEN ? AND ? ORDER BY date",
+                           (f"{year}-01-01", f"{year}-12-31"))
+        return {row[0]: self._from_row(row) for row in rows}
+
+    def get_data_for_date(self, selected_date):
+        rows = self._query(f"{self._select_sql} WHERE date = ?",
+                           (selected_date.strftime('%Y-%m-%d'),))
+        return self._from_row(rows[0]) if rows else DayRecord()
 
+    def save_data_for_date(self, selected_date, data):
+        with self._lock, self.conn, metrics.timer('storage.write'):
+            self.conn.execute(self._insert_sql, self._to_row(selected_date.strftime('%Y-%m-%d'), data))
+
+    def save_many(self, records):
+        """Saves an iterable of (date, data) pairs in a single transaction."""
+        with self._lock, self.conn, metrics.timer('storage.write'):
+            self.conn.executemany(self._insert_sql, (
+                self._to_row(selected_date.strftime('%Y-%m-%d'), data)
+                for selected_date, data in records
+            ))
+
+    def _fetch_in_batches(self, sql, params, batch_size=500):
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def iter_days(self, start_date, end_date, batch_size=500):
+        rows = self._fetch_in_batches(f"{self._select_sql} WHERE date BETWEEN ? AND ? ORDER BY date",
+                                      (start_date.isoformat(), end_date.isoformat()), batch_size)
+        for row in rows:
+            yield row[0], self._from_row(row)
+
+    def query(self, start_date, end_date, fields=None):
+        """Like `StorageBackend.query`, but only the requested columns are read."""
+        if fields is None:
+            return self.iter_days(start_date, end_date)
+        fields = tuple(fields)
+        unknown = [field for field in fields if field not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        rows = self._fetch_in_batches(
+            f"SELECT {', '.join(('date',) + fields)} FROM days WHERE date BETWEEN ? AND ? ORDER BY date",
+            (start_date.isoformat(), end_date.isoformat()))
+        return ((row[0], {field: value for field, value in zip(fields, row[1:]) if value is not None})
+                for row in rows)
+
+    def load_columns(self, start_date, end_date):
+        rows = self._query(f"{self._select_sql} WHERE date BETWEEN ? AND ? ORDER BY date",
+                           (start_date.isoformat(), end_date.isoformat()))
+        return ColumnarData.from_items((row[0], self._from_row(row)) for row in rows)
+
+    def _summary_columns(self):
+        """SQL expressions for the report totals, in `_row_to_summary` order."""
+        totals = ["COUNT(*)"] + [f"COALESCE(SUM({field}), 0)" for field in SUMMARY_FIELDS.values()]
+        for field in AVERAGE_FIELDS.values():
+            totals += [f"COALESCE(SUM({field}), 0)", f"COUNT({field})"]
+        totals += [f"COALESCE(SUM({field} = 'Yes'), 0)" for field in HABIT_TOTALS.values()]
+        return ", ".join(totals)
+
+    def _row_to_summary(self, row):
+        summary = new_summary()
+        values = iter(row)
+        summary['entries'] = next(values)
+        for key in SUMMARY_FIELDS:
+            summary[key] = next(values)
+        for key in AVERAGE_FIELDS:
+            summary[f'{key}_total'] = next(values)
+            summary[f'{key}_days'] = next(values)
+        for key in HABIT_TOTALS:
+            summary[key] = next(values)
+        return summary
+
+    def summarize(self, start_date, end_date):
+        rows = self._query(
+            f"SELECT {self._summary_columns()} FROM days WHERE date BETWEEN ? AND ?",
+            (start_date.isoformat(), end_date.isoformat()),
+        )
+        return self._row_to_summary(rows[0])
+
+    def year_summaries(self, year):
+        rows = self._query(
+            f"SELECT CAST(substr(date, 6, 2) AS INTEGER) AS month, {self._summary_columns()} "
+            f"FROM days WHERE date BETWEEN ? AND ? GROUP BY month",
+            (f"{year}-01-01", f"{year}-12-31"),
+        )
+        return {row[0]: self._row_to_summary(row[1:]) for row in rows}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class BinaryDataHandler(StorageBackend):
+    """Stores each year as a memory-mapped file of fixed-width day rows.
+
+    `<year>.days` holds a short header followed by 366 rows, one per day of
+    the year, so a day's row lives at an offset computed from its date. A row
+    is a flags word (bit 0: the day has an entry, bit 1+i: numeric field i is
+    set), one byte per choice field (0 = unset, else 1 + index into its
+    choices) and a float64 per numeric field, NaN when unset. Notes, and any
+    value a row can't represent, go to an append-only `<year>.notes.jsonl`
+    side file where the last record for a date wins.
+
+    Reads and saves of a day only touch that day's bytes of the mapping, and
+    with NumPy `load_columns` reads the numeric columns straight out of the
+    mapped buffer. Note search uses a `NotesIndex` keyed on the side files'
+    signatures, patched whenever a side file is appended to.
+    """
+    name = "binary"
+    MAGIC = b"HTBD"
+    VERSION = 1
+    HEADER = struct.Struct('<4sHHI4x') # magic, version, row size, schema checksum
+    DAYS_PER_YEAR = 366
+
+    def __init__(self, data_dir, cache_size=YEAR_CACHE_SIZE, compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.data_dir = data_dir
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        self.cache_size = cache_size
+        self.compact_bytes = compact_bytes
+        self._maps = OrderedDict() # year -> (open file, mmap)
+        self._notes = {} # year -> (side file signature, {date_key: values}), for mapped years
+        self.notes_index = NotesIndex(os.path.join(self.data_dir, NOTES_INDEX_DIR_NAME), compact_bytes)
+        self._choice_fields = tuple(field.name for field in SCHEMA if field.kind == 'choice')
+        self._side_fields = tuple(field.name for field in SCHEMA if field.kind == 'text')
+        layout = '<I' + 'B' * len(self._choice_fields)
+        layout += 'x' * (-struct.calcsize(layout) % 8) + 'd' * len(NUMERIC_FIELDS)
+        self._row = struct.Struct(layout)
+        schema = ",".join(self._choice_fields + NUMERIC_FIELDS)
+        self._header = self.HEADER.pack(self.MAGIC, self.VERSION, self._row.size, zlib.crc32(schema.encode()))
+        self._blank_row = self._row.pack(0, *[0] * len(self._choice_fields),
+                                         *[float('nan')] * len(NUMERIC_FIELDS))
+
+    def _get_filepath(self, year):
+        return os.path.join(self.data_dir, f"{year}.days")
+
+    def _get_notes_path(self, year):
+        return os.path.join(self.data_dir, f"{year}.notes.jsonl")
+
+    def available_years(self):
+        years = set()
+        for filename in os.listdir(self.data_dir):
+            match = re.fullmatch(r'(\d{4})\.days', filename)
+            if match:
+                years.add(int(match.group(1)))
+        return sorted(years)
+
+    def _offset(self, day):
+        return self.HEADER.size + (day.timetuple().tm_yday - 1) * self._row.size
+
+    def _map(self, year, create=False):
+        """Returns the year's mapping, opening (or creating) the file on first use.
+
+        Returns None if the year has no file and `create` is False.
+        """
+        entry = self._maps.get(year)
+        if entry is not None:
+            self._maps.move_to_end(year)
+            return entry[1]
         filepath = self._get_filepath(year)
-        with open(filepath, 'w') as f:
-            json.dump(year_data, f, indent=4)
+        if not os.path.exists(filepath):
+            if not create:
+                return None
+            tmp_path = filepath + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(self._header + self._blank_row * self.DAYS_PER_YEAR)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+        f = open(filepath, 'r+b')
+        try:
+            mm = mmap.mmap(f.fileno(), 0)
+        except (OSError, ValueError):
+            f.close()
+            raise
+        if mm[:self.HEADER.size] != self._header or len(mm) != self.HEADER.size + self._row.size * self.DAYS_PER_YEAR:
+            mm.close()
+            f.close()
+            raise ValueError(f"{filepath} is not a binary day file or uses a different field layout; "
+                             f"convert it back to JSON with the previous version first.")
+        self._maps[year] = (f, mm)
+        while len(self._maps) > self.cache_size:
+            evicted, (old_file, old_map) = self._maps.popitem(last=False)
+            self._notes.pop(evicted, None)
+            old_map.flush() # A save may have written to it without flushing yet
+            old_map.close()
+            old_file.close()
+        return mm
+
+    def _notes_signature(self, year):
+        try:
+            stat = os.stat(self._get_notes_path(year))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load_notes(self, year):
+        """Returns {date_key: side values} for a year, replaying the side file if it changed."""
+        path = self._get_notes_path(year)
+        signature = self._notes_signature(year)
+        cached = self._notes.get(year)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        notes = {}
+        if signature is not None:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        notes[record['date']] = record['data']
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue # Skip a torn last line left by a crash
+        notes = {date_key: values for date_key, values in notes.items() if values}
+        if year in self._maps:
+            self._notes[year] = (signature, notes)
+        return notes
+
+    def _unpack(self, mm, offset, side):
+        """Returns the DayRecord stored at `offset` with its side values, or None if the day has no entry."""
+        values = self._row.unpack_from(mm, offset)
+        flags = values[0]
+        if not flags & 1:
+            return None
+        data = {}
+        for i, name in enumerate(self._choice_fields, start=1):
+            if values[i]:
+                data[name] = FIELDS[name].choices[values[i] - 1]
+        start = 1 + len(self._choice_fields)
+        for i, name in enumerate(NUMERIC_FIELDS):
+            if flags & (2 << i):
+                value = values[start + i]
+                data[name] = int(value) if value.is_integer() else value
+        if side:
+            data.update(side)
+        return DayRecord(**data)
+
+    def _pack(self, data):
+        """Returns (row bytes, side values) for one day's record."""
+        side = {}
+        flags = 1
+        choices = []
+        for name in self._choice_fields:
+            value = data.get(name)
+            if value in FIELDS[name].choices:
+                choices.append(FIELDS[name].choices.index(value) + 1)
+            else:
+                choices.append(0)
+                if value is not None:
+                    side[name] = value
+        numbers = []
+        for i, name in enumerate(NUMERIC_FIELDS):
+            value = data.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                flags |= 2 << i
+                numbers.append(float(value))
+            else:
+                numbers.append(float('nan'))
+                if value is not None:
+                    side[name] = value
+        for name, value in data.items():
+            if name not in FIELDS or name in self._side_fields:
+                side[name] = value
+        return self._row.pack(flags, *choices, *numbers), side
+
+    def load_year_data(self, year):
+        mm = self._map(year)
+        if mm is None:
+            return {}
+        return dict(self.iter_days(date(year, 1, 1), date(year, 12, 31)))
+
+    def get_data_for_date(self, selected_date):
+        mm = self._map(selected_date.year)
+        if mm is None:
+            return DayRecord()
+        date_key = selected_date.strftime('%Y-%m-%d')
+        side = self._load_notes(selected_date.year).get(date_key)
+        return self._unpack(mm, self._offset(selected_date), side) or DayRecord()
+
+    def save_data_for_date(self, selected_date, data):
+        self.save_many([(selected_date, data)])
+
+    def save_many(self, records):
+        """Writes each day's row in place, then flushes each touched year once."""
+        touched = set()
+        side_records = {}
+        with metrics.timer('storage.write'):
+            for selected_date, data in records:
+                year = selected_date.year
+                mm = self._map(year, create=True)
+                row, side = self._pack(DayRecord.from_dict(data))
+                mm[self._offset(selected_date):self._offset(selected_date) + self._row.size] = row
+                touched.add(year)
+                date_key = selected_date.strftime('%Y-%m-%d')
+                pending = side_records.setdefault(year, {})
+                current = pending[date_key] if date_key in pending else self._load_notes(year).get(date_key, {})
+                if side != current:
+                    pending[date_key] = side
+            for year in touched:
+                if year in self._maps: # Evicted maps were flushed on the way out
+                    self._maps[year][1].flush()
+            for year, changes in side_records.items():
+                if changes:
+                    self._append_notes(year, changes)
+
+    def _append_notes(self, year, changes):
+        path = self._get_notes_path(year)
+        old_signature = self._notes_signature(year)
+        old_notes = self._load_notes(year)
+        notes = dict(old_notes)
+        with open(path, 'a', encoding='utf-8') as f:
+            for date_key, side in changes.items():
+                f.write(json.dumps({'date': date_key, 'data': side}, separators=(',', ':')) + "\n")
+                if side:
+                    notes[date_key] = side
+                else:
+                    notes.pop(date_key, None)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.getsize(path) >= self.compact_bytes:
+            self._compact_notes(year, notes)
+        new_signature = self._notes_signature(year)
+        if year in self._maps:
+            # Already merged, so the next read doesn't replay the whole side file
+            self._notes[year] = (new_signature, notes)
+        note_changes = [(date_key, old_notes.get(date_key, {}).get('notes'), side.get('notes'))
+                        for date_key, side in changes.items()]
+        if not self.notes_index.update_days(year, old_signature, new_signature, note_changes):
+            self.notes_index.set_year(year, new_signature, self._year_notes(notes))
+
+    @staticmethod
+    def _year_notes(side_values):
+        return {date_key: side['notes'] for date_key, side in side_values.items() if side.get('notes')}
+
+    def search_notes(self, query, limit=SEARCH_LIMIT):
+        """Answers from the notes index, reindexing only years whose side file changed outside the app."""
+        years = self.available_years()
+        with metrics.timer('search.notes'):
+            self.notes_index.sync(years, self._notes_signature,
+                                  lambda year: self._year_notes(self._load_notes(year)))
+            return self.notes_index.search(query, years, limit)
+
+    def _compact_notes(self, year, notes):
+        """Rewrites the side file with only the latest record per date."""
+        path = self._get_notes_path(year)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for date_key in sorted(notes):
+                f.write(json.dumps({'date': date_key, 'data': notes[date_key]}, separators=(',', ':')) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def iter_days(self, start_date, end_date):
+        """Yields (date_key, data) in date order, reading only the rows in range."""
+        for year in self.available_years():
+            if not start_date.year <= year <= end_date.year:
+                continue
+            mm = self._map(year)
+            notes = self._load_notes(year)
+            first = max(start_date, date(year, 1, 1)).toordinal()
+            last = min(end_date, date(year, 12, 31)).toordinal()
+            offset = self._offset(date.fromordinal(first))
+            for ordinal in range(first, last + 1):
+                if self._row.unpack_from(mm, offset)[0] & 1:
+                    date_key = date.fromordinal(ordinal).isoformat()
+                    yield date_key, self._unpack(mm, offset, notes.get(date_key))
+                offset += self._row.size
+
+    def _dtype(self):
+        """NumPy record type matching one row, for viewing a mapping without copying."""
+        names = ['flags'] + list(self._choice_fields) + list(NUMERIC_FIELDS)
+        formats = ['<u4'] + ['u1'] * len(self._choice_fields) + ['<f8'] * len(NUMERIC_FIELDS)
+        offsets = [0] + [4 + i for i in range(len(self._choice_fields))]
+        numbers_at = self._row.size - 8 * len(NUMERIC_FIELDS)
+        offsets += [numbers_at + 8 * i for i in range(len(NUMERIC_FIELDS))]
+        return np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': self._row.size})
+
+    def load_columns(self, start_date, end_date):
+        """Builds `ColumnarData` from views of the mapped rows when NumPy is available."""
+        if load_numpy() is None:
+            return super().load_columns(start_date, end_date)
+        dtype = self._dtype()
+        parts = []
+        for year in self.available_years():
+            if not start_date.year <= year <= end_date.year:
+                continue
+            first_day = date(year, 1, 1)
+            lo = (max(start_date, first_day) - first_day).days
+            hi = (min(end_date, date(year, 12, 31)) - first_day).days + 1
+            rows = np.frombuffer(self._map(year), dtype=dtype, count=self.DAYS_PER_YEAR,
+                                 offset=self.HEADER.size)[lo:hi]
+            present = np.flatnonzero(rows['flags'] & 1)
+            # Indexing copies just the rows in range, so no view of the mapping outlives this loop
+            parts.append((first_day.toordinal() + lo + present,
+                          {field: rows[field][present] == FIELDS[field].choices.index("Yes") + 1
+                           for field in HABIT_FIELDS},
+                          {field: rows[field][present] for field in NUMERIC_FIELDS}))
+            del rows
+        if not parts:
+            return ColumnarData.from_items(())
+        ordinals = np.concatenate([part[0] for part in parts]).astype(np.int64)
+        days = (ordinals - date(1970, 1, 1).toordinal()).astype('datetime64[D]')
+        months = days.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        weekdays = (ordinals - 1) % 7
+        habits = {field: np.concatenate([part[1][field] for part in parts]) for field in HABIT_FIELDS}
+        columns = {field: np.concatenate([part[2][field] for part in parts]) for field in NUMERIC_FIELDS}
+        return ColumnarData(ordinals, months, weekdays, habits, columns)
+
+    def close(self):
+        for f, mm in self._maps.values():
+            mm.close()
+            f.close()
+        self._maps.clear()
+        self._notes.clear()
+
+
+def create_data_handler(data_dir=DATA_DIR, backend=STORAGE_BACKEND):
+    """Returns the storage backend selected in the configuration."""
+    if backend == "sqlite":
+        return SqliteDataHandler(data_dir)
+    if backend == "binary":
+        return BinaryDataHandler(data_dir)
+    if backend == "json":
+        return DataHandler(data_dir)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def _copy_days(source, target):
+    """Copies every day from one backend into another, one year at a time.
+
+    Malformed date keys are skipped. Returns the number of days copied.
+    """
+    count = 0
+    for year in source.available_years():
+        records = []
+        for date_key, data in source.load_year_data(year).items():
+            try:
+                records.append((datetime.strptime(date_key, '%Y-%m-%d').date(), data))
+            except ValueError:
+                continue # Skip malformed keys
+        target.save_many(records)
+        count += len(records)
+    return count
+
+
+def migrate_json_to_sqlite(data_dir=DATA_DIR):
+    """Copies every year file (and its journal) into the SQLite database.
+
+    Existing JSON files are left in place. Returns the number of days copied.
+    """
+    target = SqliteDataHandler(data_dir)
+    try:
+        return _copy_days(DataHandler(data_dir), target)
+    finally:
+        target.close()
+
+
+def migrate_json_to_binary(data_dir=DATA_DIR):
+    """Copies every year file (and its journal) into the binary `<year>.days` files.
+
+    Existing JSON files are left in place. Returns the number of days copied.
+    """
+    target = BinaryDataHandler(data_dir)
+    try:
+        return _copy_days(DataHandler(data_dir), target)
+    finally:
+        target.close()
+
+
+def migrate_binary_to_json(data_dir=DATA_DIR):
+    """Copies every binary year file back into the JSON year files.
+
+    Days already in the JSON files are overwritten; the binary files are left
+    in place. Returns the number of days copied.
+    """
+    source = BinaryDataHandler(data_dir)
+    try:
+        return _copy_days(source, DataHandler(data_dir))
+    finally:
+        source.close()
+
+
+# --- BULK IMPORT ---
+def _read_import_rows(path, fmt):
+    """Yields (line number, raw values) from a CSV or JSONL file, one row at a time."""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_num, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_num, exc
+                continue
+            if isinstance(row, dict) and isinstance(row.get('data'), dict):
+                row = dict(row['data'], date=row.get('date')) # Journal record layout
+            yield line_num, row
+
+
+def import_history(path, data_handler, fmt=None, max_errors=20):
+    """Streams historical rows from a CSV or JSONL file into storage.
+
+    Each row needs a 'date' (YYYY-MM-DD) plus any of the tracked fields, and is
+    validated like a form save. Valid rows are first spilled to one temporary
+    file per year, then each year is merged into storage with a single
+    `save_many` call, so memory holds at most one year of rows and every year
+    file is rewritten once regardless of input order. A later row for the same
+    date replaces an earlier one.
+
+    Returns a dict with 'rows', 'imported', 'rejected', 'errors' (the first
+    `max_errors` (line, reason) pairs), 'years' and 'seconds'.
+    """
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Unknown import format: {fmt}")
+    started = time.perf_counter()
+    result = {'rows': 0, 'imported': 0, 'rejected': 0, 'errors': [], 'years': [], 'seconds': 0.0}
+
+    def reject(line_num, reason):
+        result['rejected'] += 1
+        if len(result['errors']) < max_errors:
+            result['errors'].append((line_num, reason))
+
+    with tempfile.TemporaryDirectory(prefix="import-", dir=data_handler.data_dir) as spill_dir:
+        spill_files = {}
+        try:
+            for line_num, row in _read_import_rows(path, fmt):
+                result['rows'] += 1
+                if isinstance(row, Exception):
+                    reject(line_num, f"Invalid JSON: {row}")
+                    continue
+                if not isinstance(row, dict):
+                    reject(line_num, "Row is not an object")
+                    continue
+                try:
+                    entry_date = datetime.strptime(str(row.get('date', '')).strip(), '%Y-%m-%d').date()
+                except ValueError:
+                    reject(line_num, f"Invalid date: {row.get('date')!r}")
+                    continue
+                try:
+                    data = validate_entry(row)
+                except ValueError as exc:
+                    reject(line_num, str(exc))
+                    continue
+                spill = spill_files.get(entry_date.year)
+                if spill is None:
+                    spill = spill_files[entry_date.year] = open(
+                        os.path.join(spill_dir, f"{entry_date.year}.jsonl"), 'w', encoding='utf-8')
+                spill.write(json.dumps([entry_date.isoformat(), data], separators=(',', ':')) + "\n")
+        finally:
+            for spill in spill_files.values():
+                spill.close()
+
+        for year in sorted(spill_files):
+            entries = {}
+            with open(os.path.join(spill_dir, f"{year}.jsonl"), 'r', encoding='utf-8') as f:
+                for line in f:
+                    date_key, data = json.loads(line)
+                    entries[date_key] = data
+            data_handler.save_many((date.fromisoformat(date_key), data) for date_key, data in entries.items())
+            result['imported'] += len(entries)
+            result['years'].append(year)
+
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+# --- EXPORT ---
+def export_history(data_handler, out, start_date, end_date, fmt='csv', fields=None,
+                   months=None, weekdays=None):
+    """Streams the days between two dates to an open text file as CSV or JSONL.
+
+    Rows are written as they are read, so memory use doesn't grow with the
+    range. `fields` limits the exported columns (default: every tracked
+    field); `months` (1-12) and `weekdays` (0=Monday) filter the days.
+    Returns the number of rows written.
+    """
+    fields = list(fields) if fields else list(TRACKED_FIELDS)
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Unknown export format: {fmt}")
+    days = data_handler.query(start_date, end_date, fields)
+    months = set(months) if months else None
+    weekdays = set(weekdays) if weekdays else None
+
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['date'] + fields)
+    count = 0
+    for date_key, data in days:
+        if months is not None and int(date_key[5:7]) not in months:
+            continue
+        if weekdays is not None and date.fromisoformat(date_key).weekday() not in weekdays:
+            continue
+        if fmt == 'csv':
+            writer.writerow([date_key] + [data.get(field, "") for field in fields])
+        else:
+            out.write(json.dumps(dict(date=date_key, **data)) + "\n")
+        count += 1
+    return count
+
+
+# --- ANALYSIS ENGINE ---
+def load_numpy():
+    """Imports NumPy the first time it's needed; returns None if it isn't installed."""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+        _numpy_checked = True
+    return np
+
+
+def _as_number(value):
+    """Converts an aggregate to a plain int/float, keeping whole numbers as ints."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class ColumnarData:
+    """Daily entries stored column by column for fast aggregation.
+
+    Every numeric field becomes one array (NaN marks a missing value), next to
+    arrays of date ordinals, months and weekdays and a boolean mask per habit
+    (Yes/No field). With NumPy installed the columns are ndarrays and all
+    aggregations are vectorized; otherwise they are lists and the same methods
+    run as plain loops.
+    """
+    GROUP_KEYS = ('month', 'weekday')
+
+    def __init__(self, ordinals, months, weekdays, habits, columns):
+        self.ordinals = ordinals
+        self.months = months
+        self.weekdays = weekdays
+        self.habits = habits
+        self.columns = columns
+
+    @classmethod
+    def from_items(cls, items):
+        """Builds the columns from (date_key, data) pairs, skipping malformed keys."""
+        load_numpy()
+        ordinals, months, weekdays = [], [], []
+        habits = {field: [] for field in HABIT_FIELDS}
+        values = {field: [] for field in NUMERIC_FIELDS}
+        for date_key, data in items:
+            try:
+                entry_date = date.fromisoformat(date_key)
+            except ValueError:
+                continue
+            ordinals.append(entry_date.toordinal())
+            months.append(entry_date.month)
+            weekdays.append(entry_date.weekday())
+            for field, column in habits.items():
+                column.append(data.get(field) == 'Yes')
+            for field, column in values.items():
+                value = data.get(field)
+                column.append(value if isinstance(value, (int, float)) else None)
+
+        if np is None:
+            return cls(ordinals, months, weekdays, habits, values)
+        columns = {
+            field: np.array([np.nan if v is None else v for v in column], dtype=float)
+            for field, column in values.items()
+        }
+        return cls(np.array(ordinals, dtype=np.int64), np.array(months, dtype=np.int64),
+                   np.array(weekdays, dtype=np.int64),
+                   {field: np.array(column, dtype=bool) for field, column in habits.items()}, columns)
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def stats(self, field):
+        """Returns sum, mean, min, max and count of a field, ignoring missing days."""
+        column = self.columns[field]
+        if np is not None:
+            present = column[~np.isnan(column)]
+            count = len(present)
+            if not count:
+                return {'sum': 0, 'mean': None, 'min': None, 'max': None, 'count': 0}
+            return {'sum': _as_number(present.sum()), 'mean': float(present.mean()),
+                    'min': _as_number(present.min()), 'max': _as_number(present.max()),
+                    'count': count}
+
+        present = [v for v in column if v is not None]
+        if not present:
+            return {'sum': 0, 'mean': None, 'min': None, 'max': None, 'count': 0}
+        total = sum(present)
+        return {'sum': _as_number(total), 'mean': total / len(present),
+                'min': _as_number(min(present)), 'max': _as_number(max(present)),
+                'count': len(present)}
+
+    def total(self, field):
+        """Sums a field, counting missing days as zero."""
+        column = self.columns[field]
+        if np is not None:
+            return _as_number(np.nansum(column))
+        return _as_number(sum(v for v in column if v is not None))
+
+    def group_by(self, field, key='month', agg='sum'):
+        """Aggregates a field per month (1-12) or weekday (0=Monday).
+
+        `agg` is one of 'sum', 'count', 'mean', 'min' or 'max'. Only groups
+        that have at least one value are returned.
+        """
+        if key not in self.GROUP_KEYS:
+            raise ValueError(f"Unknown group key: {key}")
+        groups = self.months if key == 'month' else self.weekdays
+        column = self.columns[field]
+        size = 13 if key == 'month' else 7
+
+        if np is not None:
+            present = ~np.isnan(column)
+            counts = np.bincount(groups[present], minlength=size)
+            if agg == 'sum' or agg == 'mean':
+                sums = np.bincount(groups[present], weights=column[present], minlength=size)
+                values = sums if agg == 'sum' else sums / np.maximum(counts, 1)
+            elif agg == 'count':
+                values = counts
+            elif agg in ('min', 'max'):
+                fill = np.inf if agg == 'min' else -np.inf
+                values = np.full(size, fill)
+                reduce = np.minimum if agg == 'min' else np.maximum
+                reduce.at(values, groups[present], column[present])
+            else:
+                raise ValueError(f"Unknown aggregation: {agg}")
+            return {int(g): (float(values[g]) if agg == 'mean' else _as_number(values[g]))
+                    for g in np.flatnonzero(counts)}
+
+        buckets = {}
+        for group, value in zip(groups, column):
+            if value is not None:
+                buckets.setdefault(group, []).append(value)
+        reducers = {
+            'sum': lambda vs: _as_number(sum(vs)),
+            'count': len,
+            'mean': lambda vs: sum(vs) / len(vs),
+            'min': lambda vs: _as_number(min(vs)),
+            'max': lambda vs: _as_number(max(vs)),
+        }
+        if agg not in reducers:
+            raise ValueError(f"Unknown aggregation: {agg}")
+        return {group: reducers[agg](vs) for group, vs in sorted(buckets.items())}
+
+    def habit_days(self, field):
+        """Counts the days a habit was done."""
+        if np is not None:
+            return int(np.count_nonzero(self.habits[field]))
+        return sum(self.habits[field])
+
+    def summary(self):
+        """Returns the report totals (see `new_summary`) for all rows."""
+        summary = new_summary()
+        summary['entries'] = len(self)
+        for key, field in SUMMARY_FIELDS.items():
+            summary[key] = self.total(field)
+        for key, field in AVERAGE_FIELDS.items():
+            stats = self.stats(field)
+            summary[f'{key}_total'] = stats['sum']
+            summary[f'{key}_days'] = stats['count']
+        for key, field in HABIT_TOTALS.items():
+            summary[key] = self.habit_days(field)
+        return summary
+
+    def monthly_summaries(self):
+        """Returns report totals per month (1-12) that has entries."""
+        months = sorted(set(int(m) for m in self.months))
+        summaries = {month: new_summary() for month in months}
+        for key, field in SUMMARY_FIELDS.items():
+            for month, value in self.group_by(field, 'month', 'sum').items():
+                summaries[month][key] = value
+        for key, field in AVERAGE_FIELDS.items():
+            for month, value in self.group_by(field, 'month', 'sum').items():
+                summaries[month][f'{key}_total'] = value
+            for month, value in self.group_by(field, 'month', 'count').items():
+                summaries[month][f'{key}_days'] = value
+        if np is not None:
+            entries = np.bincount(self.months, minlength=13)
+            done = {key: np.bincount(self.months[self.habits[field]], minlength=13)
+                    for key, field in HABIT_TOTALS.items()}
+            for month in months:
+                summaries[month]['entries'] = int(entries[month])
+                for key, counts in done.items():
+                    summaries[month][key] = int(counts[month])
+        else:
+            for month in self.months:
+                summaries[month]['entries'] += 1
+            for key, field in HABIT_TOTALS.items():
+                for month, done in zip(self.months, self.habits[field]):
+                    summaries[month][key] += done
+        return summaries
+
+# --- TRENDS ---
+class RollingWindow:
+    """Running per-field sums and counts over the last `days` calendar days.
+
+    Each day is added once and evicted once, so sliding the window across
+    the whole history costs O(days * fields) no matter how wide it is.
+    """
+    def __init__(self, days, fields):
+        self.days = days
+        self.fields = fields
+        self.totals = [0] * len(fields)
+        self.counts = [0] * len(fields)
+        self.peaks = [None] * len(fields) # (highest total, ordinal of the window's last day)
+        self._days = deque() # (ordinal, values) currently inside the window
+
+    def advance(self, ordinal):
+        """Drops the days that are no longer within `days` of `ordinal`."""
+        oldest = ordinal - self.days
+        while self._days and self._days[0][0] <= oldest:
+            _, values = self._days.popleft()
+            for i, value in enumerate(values):
+                if value is not None:
+                    self.totals[i] -= value
+                    self.counts[i] -= 1
+
+    def push(self, ordinal, values):
+        self.advance(ordinal)
+        self._days.append((ordinal, values))
+        totals, counts, peaks = self.totals, self.counts, self.peaks
+        for i, value in enumerate(values):
+            if value is not None:
+                totals[i] += value
+                counts[i] += 1
+                if peaks[i] is None or totals[i] > peaks[i][0]:
+                    peaks[i] = (totals[i], ordinal)
+
+    def snapshot(self):
+        """Returns {field: {'sum', 'average', 'days', 'peak_sum', 'peak_end'}}."""
+        result = {}
+        for i, field in enumerate(self.fields):
+            count, peak = self.counts[i], self.peaks[i]
+            result[field] = {
+                'sum': self.totals[i],
+                'average': self.totals[i] / count if count else None,
+                'days': count,
+                'peak_sum': peak[0] if peak else None,
+                'peak_end': date.fromordinal(peak[1]) if peak else None,
+            }
+        return result
+
+
+class HabitStreak:
+    """Current and longest run of consecutive days a Yes/No habit was done."""
+    def __init__(self):
+        self.run = 0
+        self.last = None # Ordinal of the last day in the current run
+        self.longest = 0
+        self.longest_end = None
+
+    def push(self, ordinal, done):
+        if not done:
+            self.run, self.last = 0, None
+            return
+        self.run = self.run + 1 if self.last == ordinal - 1 else 1
+        self.last = ordinal
+        if self.run > self.longest:
+            self.longest, self.longest_end = self.run, ordinal
+
+    def current(self, as_of):
+        """The run still going on `as_of`; a run that ended the day before
+        counts too, since today may just not have been entered yet."""
+        return self.run if self.last is not None and as_of - self.last <= 1 else 0
+
+
+def compute_trends(days, as_of, windows=TREND_WINDOWS, fields=NUMERIC_FIELDS, habits=HABIT_FIELDS):
+    """Streaks and rolling windows from one pass over (date_key, record) pairs in date order.
+
+    Days without an entry break streaks and simply don't count towards a
+    window, so averages are per day with a value.
+    """
+    rolling = [RollingWindow(size, fields) for size in windows]
+    streaks = {habit: HabitStreak() for habit in habits}
+    entries, first, last = 0, None, None
+    with metrics.timer('report.trends'):
+        for date_key, data in days:
+            try:
+                ordinal = date.fromisoformat(date_key).toordinal()
+            except ValueError:
+                continue
+            values = tuple(value if isinstance(value, (int, float)) else None
+                           for value in map(data.get, fields))
+            for window in rolling:
+                window.push(ordinal, values)
+            for habit, streak in streaks.items():
+                streak.push(ordinal, data.get(habit) == "Yes")
+            entries += 1
+            first = first or date_key
+            last = date_key
+        as_of_ordinal = as_of.toordinal()
+        for window in rolling:
+            window.advance(as_of_ordinal)
+    return {
+        'as_of': as_of,
+        'entries': entries,
+        'first': first,
+        'last': last,
+        'streaks': {
+            habit: {
+                'current': streak.current(as_of_ordinal),
+                'longest': streak.longest,
+                'longest_end': date.fromordinal(streak.longest_end) if streak.longest_end else None,
+            }
+            for habit, streak in streaks.items()
+        },
+        'windows': {window.days: window.snapshot() for window in rolling},
+    }
+
+
+def history_trends(data_handler, as_of):
+    """Trends over every entry up to and including `as_of`, read one year at a time."""
+    years = [year for year in data_handler.available_years() if year <= as_of.year]
+    if not years:
+        return compute_trends((), as_of)
+    return compute_trends(data_handler.iter_days(date(years[0], 1, 1), as_of), as_of)
+
+# --- CHARTS ---
+def field_series(data_handler, start_date, end_date, field):
+    """Returns parallel lists (date ordinals, values) of the days in range where `field` is a number."""
+    xs, ys = [], []
+    for date_key, data in data_handler.query(start_date, end_date, [field]):
+        value = data.get(field)
+        if isinstance(value, (int, float)):
+            xs.append(date.fromisoformat(date_key).toordinal())
+            ys.append(value)
+    return xs, ys
+
+
+def lttb(xs, ys, threshold):
+    """Downsamples a series to `threshold` points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; from each bucket in between, the point
+    forming the largest triangle with the previously kept point and the
+    average of the next bucket is chosen, which preserves peaks and dips far
+    better than plain averaging.
+    """
+    n = len(xs)
+    threshold = max(threshold, 3) # The first and last points plus at least one bucket
+    if n <= threshold:
+        return list(xs), list(ys)
+    out_x, out_y = [xs[0]], [ys[0]]
+    bucket = (n - 2) / (threshold - 2)
+    kept = 0
+    for i in range(threshold - 2):
+        start, end = int(i * bucket) + 1, int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        avg_x = sum(xs[end:next_end]) / (next_end - end)
+        avg_y = sum(ys[end:next_end]) / (next_end - end)
+        ax, ay = xs[kept], ys[kept]
+        best_area, best = -1, start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area, best = area, j
+        out_x.append(xs[best])
+        out_y.append(ys[best])
+        kept = best
+    out_x.append(xs[-1])
+    out_y.append(ys[-1])
+    return out_x, out_y
+
+# --- RANGE REPORTS ---
+def summarize_year_in_range(backend, data_dir, year, start_date, end_date):
+    """Process pool worker: report totals for the part of one year inside a range.
+
+    Each worker opens its own read-only handler, so it shares nothing with the
+    Tk process apart from the files on disk.
+    """
+    handler = create_data_handler(data_dir, backend)
+    try:
+        return year, handler.summarize(max(start_date, date(year, 1, 1)),
+                                       min(end_date, date(year, 12, 31)))
+    finally:
+        handler.close()
+
+
+class RangeReport:
+    """Computes report totals for a date range, one year per pool task.
+
+    `start` submits the work and returns immediately; the caller polls
+    `progress`/`done` (e.g. from a Tk `after()` loop) and reads `result` once
+    every year has finished.
+    """
+    def __init__(self, data_handler, start_date, end_date, years=None, max_workers=None):
+        self.data_handler = data_handler
+        self.start_date = start_date
+        self.end_date = end_date
+        if years is None:
+            years = data_handler.available_years()
+        self.years = [y for y in years if start_date.year <= y <= end_date.year]
+        self.max_workers = max_workers or min(len(self.years), os.cpu_count() or 1) or 1
+        self.cancelled = False
+        self._executor = None
+        self._futures = []
+
+    def start(self):
+        if not self.years:
+            return
+        import multiprocessing # Imported on first use to keep startup fast
+        from concurrent.futures import ProcessPoolExecutor
+        # Spawn rather than fork: a forked child copies the storage thread's
+        # locks (possibly held) and the open metrics trace file
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        self._futures = [
+            self._executor.submit(summarize_year_in_range, self.data_handler.name,
+                                  self.data_handler.data_dir, year, self.start_date, self.end_date)
+            for year in self.years
+        ]
+
+    def progress(self):
+        """Returns (finished years, total years)."""
+        return sum(future.done() for future in self._futures), len(self.years)
+
+    def done(self):
+        finished, total = self.progress()
+        return finished == total
+
+    def cancel(self):
+        self.cancelled = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def result(self):
+        """Returns (merged totals, totals per year). Raises if a worker failed."""
+        per_year = dict(future.result() for future in self._futures)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        per_year = {year: summary for year, summary in per_year.items() if summary['entries']}
+        return merge_summaries(per_year.values()), per_year
+
+# --- BACKGROUND STORAGE ---
+class StorageWorker:
+    """Runs storage calls on a single background thread.
+
+    Calls are executed one at a time in submission order, so a save followed by
+    a load always sees the saved data. Tk widgets must only be touched from the
+    Tk thread, so results are queued and handed to their callbacks from an
+    `after()` loop that runs only while calls are outstanding.
+    """
+    def __init__(self, tk_root, poll_ms=WORKER_POLL_MS):
+        self.tk_root = tk_root
+        self.poll_ms = poll_ms
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = 0
+        self._polling = False
+        self._thread = threading.Thread(target=self._run, name="storage-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        """Queues `func(*args)`; `on_done(result)` or `on_error(exc)` runs on the Tk thread."""
+        self._pending += 1
+        self._requests.put((func, args, on_done, on_error))
+        if not self._polling:
+            self._polling = True
+            self.tk_root.after(self.poll_ms, self._poll)
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            func, args, on_done, on_error = request
+            try:
+                self._results.put((on_done, func(*args), None))
+            except Exception as exc:
+                self._results.put((on_error, None, exc))
+
+    def _deliver(self):
+        """Hands every finished call's result to its callback."""
+        while True:
+            try:
+                callback, result, error = self._results.get_nowait()
+            except queue.Empty:
+                return
+            self._pending -= 1
+            # Errors are reported the way Tk reports a failing callback, so one
+            # bad call can't stop later results (or closing) from going through
+            if error is not None and callback is None:
+                self.tk_root.report_callback_exception(type(error), error, error.__traceback__)
+                continue
+            if callback is None:
+                continue
+            try:
+                callback(error if error is not None else result)
+            except Exception:
+                self.tk_root.report_callback_exception(*sys.exc_info())
+
+    def _poll(self):
+        try:
+            self._deliver()
+        finally:
+            if self._pending:
+                self.tk_root.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+
+    def shutdown(self):
+        """Waits for queued calls (e.g. pending saves) to finish, stops the thread and
+        runs the callbacks that are still outstanding."""
+        self._requests.put(None)
+        self._thread.join()
+        self._deliver()
+
+
+class WriteBehindQueue:
+    """Collects autosaved days and writes them in batches on the storage worker.
+
+    Staging a day replaces any earlier unsaved version of it. A flush hands
+    every staged day to one `save_many` call, which the backends turn into one
+    write per year file. Flushes run `delay_ms` after the first staged edit,
+    so a quick editing session across many days costs a handful of writes.
+    Days from a failed write are staged again and retried with the next flush.
+    """
+    def __init__(self, tk_root, storage_worker, data_handler, delay_ms=AUTOSAVE_DELAY_MS, on_status=None):
+        self.tk_root = tk_root
+        self.storage_worker = storage_worker
+        self.data_handler = data_handler
+        self.delay_ms = delay_ms
+        self.on_status = on_status
+        self.pending = {} # date -> record, not yet handed to the worker
+        self.error = None # The last failed write, until a write succeeds
+        self._writing = 0
+        self._flush_id = None
+
+    def _status(self, text):
+        if self.on_status is not None:
+            self.on_status(text)
+
+    def stage(self, selected_date, data):
+        self.pending[selected_date] = data
+        metrics.count('autosave.edits')
+        if self._flush_id is None:
+            self._flush_id = self.tk_root.after(self.delay_ms, self.flush)
+        self._status("Unsaved changes")
+
+    def flush(self):
+        """Queues every staged day for writing now."""
+        if self._flush_id is not None:
+            self.tk_root.after_cancel(self._flush_id)
+            self._flush_id = None
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        self._writing += 1
+        metrics.count('autosave.flushes')
+        self._status("Saving...")
+        self.storage_worker.submit(
+            self.data_handler.save_many, list(batch.items()),
+            on_done=lambda _: self._flushed(),
+            on_error=lambda exc: self._failed(batch, exc),
+        )
+
+    def _flushed(self):
+        self._writing -= 1
+        self.error = None
+        if not self.pending and not self._writing:
+            self._status(f"All changes saved at {datetime.now().strftime('%H:%M:%S')}")
+
+    def _failed(self, batch, exc):
+        self._writing -= 1
+        self.error = exc
+        for selected_date, data in batch.items():
+            self.pending.setdefault(selected_date, data) # Unless edited again since
+        self._status(f"Autosave failed: {exc}")
+
 
 class HabitTrackerApp(tk.Tk):
     """The main application class for the Habit & Finance Tracker."""
 
-    def __init__(self):
+    def __init__(self, report_startup=False):
         super().__init__()
         self.title(APP_TITLE)
         self.geometry(GEOMETRY)
@@ -127,32 +2530,52 @@ class HabitTrackerApp(tk.Tk):
         self.resizable(False, False)
 
         StyleManager.apply_styles()
-        self.data_handler = DataHandler(DATA_DIR)
+        self.data_handler = create_data_handler()
+        self.storage_worker = StorageWorker(self)
+        self._load_after_id = None
+        self.analysis_window = None # Built on first use, then reused
+        self.search_window = None # Likewise, while it stays open
+        self.report_startup = report_startup
+        self._first_frame_shown = False
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         
         self.selected_date = tk.StringVar(value=date.today().strftime('%Y-%m-%d'))
         
         # --- UI Variables ---
-        self.vars = {
-            'morning_juice': tk.StringVar(value="No"),
-            'water_intake': tk.StringVar(),
-            'sleep_hours': tk.StringVar(),
-            'self_improvement_time': tk.StringVar(),
-            'education_time': tk.StringVar(),
-            'github_commits': tk.StringVar(),
-            'linkedin_posts': tk.StringVar(),
-            'linkedin_engagement': tk.StringVar(),
-            'facebook_posts': tk.StringVar(),
-            'facebook_engagement': tk.StringVar(),
-            'instagram_posts': tk.StringVar(),
-            'instagram_engagement': tk.StringVar(),
-            'money_earned': tk.StringVar(),
-            'money_spent': tk.StringVar(),
-            'notes': tk.StringVar()
-        }
+        self.vars = {field.name: tk.StringVar(value=field.default or "") for field in SCHEMA}
+        self.autosave_var = tk.BooleanVar(value=AUTOSAVE_MODE)
+        self.status_var = tk.StringVar()
+        self.autosaver = WriteBehindQueue(self, self.storage_worker, self.data_handler,
+                                          on_status=self.status_var.set)
+        self._filling_form = False # Set while the form is changed by a load, not by the user
+        self._loaded_date = None # Date key whose saved data is in the form; None while loading
+        self._edited_while_loading = False
+        self._parsed = {} # Field -> validated value of the current form
+        self._invalid = {} # Field -> error message of the current form
+        for name, var in self.vars.items():
+            var.trace_add('write', lambda *_, name=name: self._on_field_change(name))
 
         self._create_main_layout()
         self._create_widgets()
-        self.load_data_for_date()
+        # Show the window first; the initial load waits until it has been drawn
+        self.bind('<Map>', self._on_map, add='+')
+
+    def _on_map(self, event):
+        if event.widget is self and not self._first_frame_shown:
+            self._first_frame_shown = True
+            self.after_idle(self._on_first_frame)
+
+    def _on_first_frame(self):
+        metrics.record('startup.first_frame', (time.perf_counter() - _PROCESS_STARTED) * 1000)
+        self.load_data_for_date(on_loaded=self._on_interactive)
+
+    def _on_interactive(self):
+        metrics.record('startup.interactive', (time.perf_counter() - _PROCESS_STARTED) * 1000)
+        if self.report_startup:
+            timings, _ = metrics.snapshot()
+            print(f"Time to first frame: {timings['startup.first_frame']['max']:.1f} ms")
+            print(f"Time to interactive: {timings['startup.interactive']['max']:.1f} ms")
+            self.on_close()
 
     def _create_main_layout(self):
         """Creates the main scrolling canvas and frames for the UI."""
@@ -209,18 +2632,19 @@ class HabitTrackerApp(tk.Tk):
         self.content_frame.columnconfigure(1, weight=1)
         
         finance_card = self._create_card("Finance (Daily)", 0, 0, colspan=2)
-        self._add_entry(finance_card, "Money Earned:", self.vars['money_earned'])
-        self._add_entry(finance_card, "Money Spent:", self.vars['money_spent'])
+        self._add_entry(finance_card, FIELDS['money_earned'].form_label, self.vars['money_earned'])
+        self._add_entry(finance_card, FIELDS['money_spent'].form_label, self.vars['money_spent'])
         
         health_card = self._create_card("Health & Routine", 1, 0)
-        self._add_option(health_card, "Morning Juice:", self.vars['morning_juice'], ["Yes", "No"])
-        self._add_entry(health_card, "Water Intake (L):", self.vars['water_intake'])
-        self._add_entry(health_card, "Sleep Hours:", self.vars['sleep_hours'])
+        juice = FIELDS['morning_juice']
+        self._add_option(health_card, juice.form_label, self.vars[juice.name], list(juice.choices))
+        self._add_entry(health_card, FIELDS['water_intake'].form_label, self.vars['water_intake'])
+        self._add_entry(health_card, FIELDS['sleep_hours'].form_label, self.vars['sleep_hours'])
         
         prod_card = self._create_card("Productivity", 1, 1)
-        self._add_entry(prod_card, "Self Improvement (min):", self.vars['self_improvement_time'])
-        self._add_entry(prod_card, "Education Time (min):", self.vars['education_time'])
-        self._add_entry(prod_card, "GitHub Commits:", self.vars['github_commits'])
+        self._add_entry(prod_card, FIELDS['self_improvement_time'].form_label, self.vars['self_improvement_time'])
+        self._add_entry(prod_card, FIELDS['education_time'].form_label, self.vars['education_time'])
+        self._add_entry(prod_card, FIELDS['github_commits'].form_label, self.vars['github_commits'])
         
         social_card = self._create_card("Social Media", 2, 0, colspan=2)
         social_content_frame = ttk.Frame(social_card, style='Card.TFrame')
@@ -270,28 +2694,76 @@ class HabitTrackerApp(tk.Tk):
     def _create_footer(self):
         """Creates the save button and analysis button."""
         ttk.Button(self.footer_frame, text="Show Analysis", command=self.show_analysis).pack(side='left', padx=10, pady=10)
+        ttk.Button(self.footer_frame, text="Diagnostics", command=self.show_diagnostics).pack(side='left', padx=10, pady=10)
+        ttk.Button(self.footer_frame, text="Search Notes", command=self.show_search).pack(side='left', padx=10, pady=10)
         ttk.Button(self.footer_frame, text="Save Data", command=self.save_data, style='TButton').pack(side='right', padx=10, pady=10)
+        ttk.Checkbutton(self.footer_frame, text="Autosave", variable=self.autosave_var,
+                        command=self.toggle_autosave).pack(side='right', padx=10, pady=10)
+        ttk.Label(self.footer_frame, textvariable=self.status_var).pack(side='left', padx=10, pady=10)
 
     def update_and_load_data(self, event=None):
+        """Debounces date changes so typing a year doesn't load every keystroke."""
+        if self._load_after_id is not None:
+            self.after_cancel(self._load_after_id)
+        self._load_after_id = self.after(LOAD_DEBOUNCE_MS, self._apply_date_change)
+
+    def _apply_date_change(self):
+        self._load_after_id = None
         try:
             d = date(int(self.year_var.get()), int(self.month_var.get()), int(self.day_var.get()))
             self.selected_date.set(d.strftime('%Y-%m-%d'))
             self.load_data_for_date()
         except (ValueError, TypeError):
             # Handles invalid date combinations during entry
+            self._loaded_date = None
             self.clear_form()
 
-    def load_data_for_date(self):
-        """Loads data for the selected date and populates the form."""
+    def load_data_for_date(self, on_loaded=None):
+        """Clears the form and loads the selected date's data in the background.
+
+        `on_loaded` is called once the form has been filled. Until then edits
+        are not autosaved, since the form doesn't hold the whole day yet.
+        """
+        self._loaded_date = None
+        self._edited_while_loading = False
         self.clear_form()
+        date_key = self.selected_date.get()
         try:
-            selected_date_obj = datetime.strptime(self.selected_date.get(), '%Y-%m-%d').date()
-            data = self.data_handler.get_data_for_date(selected_date_obj)
-            for key, var in self.vars.items():
-                if key in data:
-                    var.set(data[key])
+            selected_date_obj = datetime.strptime(date_key, '%Y-%m-%d').date()
         except ValueError:
-            pass # Ignore if date is invalid
+            return # Ignore if date is invalid
+        requested = time.perf_counter()
+        staged = self.autosaver.pending.get(selected_date_obj)
+        if staged is not None: # Edited but not written yet
+            self._fill_form(date_key, staged, requested, on_loaded)
+            return
+        self.storage_worker.submit(
+            self.data_handler.get_data_for_date, selected_date_obj,
+            on_done=lambda data: self._fill_form(date_key, data, requested, on_loaded),
+            on_error=lambda exc: messagebox.showerror("Load Failed", f"Could not load {date_key}: {exc}"),
+        )
+
+    def _fill_form(self, date_key, data, requested, on_loaded=None):
+        if date_key != self.selected_date.get():
+            metrics.count('ui.stale_loads_dropped')
+            return # The user has moved on to another date
+        with metrics.timer('ui.form_refresh'):
+            self._filling_form = True
+            try:
+                for key, var in self.vars.items():
+                    if key in data:
+                        var.set(data[key])
+            finally:
+                self._filling_form = False
+            self._validate_form()
+        self._loaded_date = date_key
+        if self._edited_while_loading:
+            # Stage the merged form, not the partial one the edits were made on
+            self._edited_while_loading = False
+            self._stage_form()
+        metrics.record('ui.load_latency', (time.perf_counter() - requested) * 1000)
+        if on_loaded is not None:
+            on_loaded()
 
     def save_data(self):
         """Validates and saves the current form data."""
@@ -300,57 +2772,289 @@ class HabitTrackerApp(tk.Tk):
         except ValueError:
             messagebox.showerror("Invalid Date", "Please select a valid date.")
             return
+        if self._loaded_date != self.selected_date.get():
+            messagebox.showwarning("Still Loading", "Please wait until the day has loaded before saving.")
+            return
 
-        data_to_save = {}
-        # Validate and collect data
-        for key, var in self.vars.items():
-            value = var.get()
-            # All fields are optional except the Y/N dropdown
-            if value:
-                # Validate numeric fields
-                if key not in ['morning_juice', 'notes']:
-                    try:
-                        num_val = float(value)
-                        if num_val < 0:
-                            raise ValueError("Negative value")
-                        # Store as int if it's a whole number
-                        data_to_save[key] = int(num_val) if num_val.is_integer() else num_val
-                    except ValueError:
-                        messagebox.showerror("Invalid Input", f"Please enter a valid non-negative number for '{key.replace('_', ' ').title()}'.")
-                        return
-                else:
-                     data_to_save[key] = value
-            # For the dropdown, always save its value
-            elif key == 'morning_juice':
-                data_to_save[key] = self.vars['morning_juice'].get()
+        try:
+            with metrics.timer('ui.validate'):
+                data_to_save = validate_entry({key: var.get() for key, var in self.vars.items()})
+        except ValueError as exc:
+            messagebox.showerror("Invalid Input", str(exc))
+            return
+
+        if self.autosave_var.get():
+            # Write now, without the confirmation dialog
+            self.autosaver.stage(selected_date_obj, data_to_save)
+            self.autosaver.flush()
+            return
+
+        date_key = selected_date_obj.strftime('%Y-%m-%d')
+        requested = time.perf_counter()
 
+        def on_saved(_):
+            metrics.record('ui.save_latency', (time.perf_counter() - requested) * 1000)
+            self.status_var.set(f"Saved {date_key}")
+            messagebox.showinfo("Success", f"Data saved for {date_key}.")
 
-        self.data_handler.save_data_for_date(selected_date_obj, data_to_save)
-        messagebox.showinfo("Success", f"Data saved for {selected_date_obj.strftime('%Y-%m-%d')}.")
+        self.storage_worker.submit(
+            self.data_handler.save_data_for_date, selected_date_obj, data_to_save,
+            on_done=on_saved,
+            on_error=lambda exc: messagebox.showerror("Save Failed", f"Could not save {date_key}: {exc}"),
+        )
 
     def clear_form(self):
         """Clears all entry fields in the form."""
-        for key, var in self.vars.items():
-            if key != 'morning_juice':
-                var.set("")
-        self.vars['morning_juice'].set("No")
+        self._filling_form = True
+        try:
+            for key, var in self.vars.items():
+                var.set(FIELDS[key].default or "")
+        finally:
+            self._filling_form = False
+        self._validate_form()
+
+    def _validate_form(self):
+        """Re-checks every field, e.g. after the form was (re)loaded."""
+        self._parsed.clear()
+        self._invalid.clear()
+        for name in self.vars:
+            self._validate_field(name)
+
+    def _validate_field(self, name):
+        try:
+            self._parsed[name] = FIELDS[name].parse(self.vars[name].get())
+            self._invalid.pop(name, None)
+        except ValueError as exc:
+            self._parsed.pop(name, None)
+            self._invalid[name] = str(exc)
+
+    def _on_field_change(self, name):
+        """Validates just the edited field and, in autosave mode, stages the day."""
+        if self._filling_form:
+            return
+        with metrics.timer('ui.validate_field'):
+            self._validate_field(name)
+        if self._invalid:
+            self.status_var.set(next(iter(self._invalid.values())))
+            return
+        if not self.autosave_var.get():
+            self.status_var.set("Unsaved changes")
+            return
+        if self._loaded_date != self.selected_date.get():
+            # Staging now would replace the saved day with just these fields
+            self._edited_while_loading = True
+            return
+        self._stage_form()
+
+    def _stage_form(self):
+        """In autosave mode, stages the whole form for the selected date if it is valid."""
+        if self._invalid or not self.autosave_var.get():
+            return
+        try:
+            selected_date_obj = datetime.strptime(self.selected_date.get(), '%Y-%m-%d').date()
+        except ValueError:
+            return
+        self.autosaver.stage(selected_date_obj,
+                             {key: value for key, value in self._parsed.items() if value is not None})
+
+    def toggle_autosave(self):
+        if self.autosave_var.get():
+            self.status_var.set("Autosave on")
+        else:
+            self.autosaver.flush()
         
     def show_analysis(self):
-        """Shows a new window with data analysis."""
-        AnalysisWindow(self, self.data_handler)
+        """Shows the analysis window, building it the first time."""
+        if self.analysis_window is None or not self.analysis_window.winfo_exists():
+            self.analysis_window = AnalysisWindow(self, self.data_handler, self.storage_worker)
+        else:
+            self.analysis_window.show()
+
+    def show_diagnostics(self):
+        """Shows the timing and counter diagnostics window."""
+        DiagnosticsWindow(self, self.data_handler, self.storage_worker)
+
+    def show_search(self):
+        """Shows the note search window, building it the first time."""
+        if self.search_window is None or not self.search_window.winfo_exists():
+            self.search_window = SearchWindow(self, self.data_handler, self.storage_worker)
+        else:
+            self.search_window.show()
+
+    def go_to_date(self, selected_date):
+        """Points the date selector at a date and loads it."""
+        self.year_var.set(selected_date.year)
+        self.month_var.set(selected_date.month)
+        self.day_var.set(selected_date.day)
+        self._apply_date_change()
+
+    def on_close(self):
+        """Writes autosaved edits and lets queued saves finish before the window goes away."""
+        self.autosaver.flush()
+        self.storage_worker.shutdown()
+        if self.autosaver.pending:
+            messagebox.showerror("Autosave Failed",
+                                 f"{len(self.autosaver.pending)} day(s) could not be saved: {self.autosaver.error}")
+        self.data_handler.close()
+        self.destroy()
+
+
+class TrendChart(tk.Canvas):
+    """Line chart of one numeric field over time.
+
+    The visible part of the series is reduced with `lttb` to one point per
+    pixel of plot width, and each result is cached per (visible range, width),
+    so resizing or panning back over a range doesn't recompute it. The plot
+    is a single line item whose coordinates are replaced on every redraw, so
+    the number of canvas items doesn't grow with the data. Drag to pan, use
+    the mouse wheel to zoom.
+    """
+    PAD_LEFT, PAD_RIGHT, PAD_TOP, PAD_BOTTOM = 60, 15, 25, 25
+    MIN_SPAN_DAYS = 7
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, bg=StyleManager.COLOR_CARD, highlightthickness=1,
+                         highlightbackground=StyleManager.COLOR_BORDER, **kwargs)
+        self.xs, self.ys = [], []
+        self.view = None # (first ordinal, last ordinal) currently shown
+        self._cache = OrderedDict()
+        self._redraw_id = None
+        self._drag_x = None
+
+        text_style = {'fill': StyleManager.COLOR_TEXT, 'font': StyleManager.FONT_NORMAL}
+        self._axes = self.create_line(0, 0, 0, 0, 0, 0, fill=StyleManager.COLOR_BORDER)
+        self._line = self.create_line(0, 0, 0, 0, fill=StyleManager.COLOR_PRIMARY, width=2, state='hidden')
+        self._title = self.create_text(self.PAD_LEFT, 5, anchor='nw', **text_style)
+        self._y_max = self.create_text(self.PAD_LEFT - 5, self.PAD_TOP, anchor='e', **text_style)
+        self._y_min = self.create_text(0, 0, anchor='e', **text_style)
+        self._x_start = self.create_text(0, 0, anchor='nw', **text_style)
+        self._x_end = self.create_text(0, 0, anchor='ne', **text_style)
+
+        self.bind('<Configure>', self._schedule_redraw)
+        self.bind('<ButtonPress-1>', self._start_pan)
+        self.bind('<B1-Motion>', self._pan)
+        self.bind('<MouseWheel>', lambda event: self._zoom(event.x, 0.8 if event.delta > 0 else 1.25))
+        self.bind('<Button-4>', lambda event: self._zoom(event.x, 0.8)) # X11 wheel
+        self.bind('<Button-5>', lambda event: self._zoom(event.x, 1.25))
+
+    def set_series(self, title, xs, ys):
+        """Shows a new series, zoomed out to its full range."""
+        self.xs, self.ys = xs, ys
+        self._cache.clear()
+        self.view = (xs[0], xs[-1]) if xs else None
+        self.itemconfigure(self._title, text=title)
+        self.redraw()
+
+    def _plot_width(self):
+        return max(self.winfo_width() - self.PAD_LEFT - self.PAD_RIGHT, 1)
+
+    def _downsampled(self, width):
+        key = (self.view, width)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            metrics.count('chart.cache_hits')
+            return cached
+        with metrics.timer('chart.downsample'):
+            lo = bisect.bisect_left(self.xs, self.view[0])
+            hi = bisect.bisect_right(self.xs, self.view[1])
+            cached = lttb(self.xs[lo:hi], self.ys[lo:hi], width)
+        self._cache[key] = cached
+        while len(self._cache) > CHART_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return cached
+
+    def _schedule_redraw(self, event=None):
+        if self._redraw_id is not None:
+            self.after_cancel(self._redraw_id)
+        self._redraw_id = self.after(CHART_REDRAW_MS, self.redraw)
+
+    def redraw(self):
+        self._redraw_id = None
+        width, height = self.winfo_width(), self.winfo_height()
+        if width <= 1:
+            return # Not laid out yet; the first <Configure> redraws
+        left, right = self.PAD_LEFT, width - self.PAD_RIGHT
+        top, bottom = self.PAD_TOP, height - self.PAD_BOTTOM
+        self.coords(self._axes, left, top, left, bottom, right, bottom)
+        self.coords(self._y_min, left - 5, bottom)
+        self.coords(self._x_start, left, bottom + 3)
+        self.coords(self._x_end, right, bottom + 3)
+        if self.view is None:
+            self.itemconfigure(self._line, state='hidden')
+            for item in (self._y_max, self._y_min, self._x_start, self._x_end):
+                self.itemconfigure(item, text="")
+            return
+
+        with metrics.timer('chart.redraw'):
+            xs, ys = self._downsampled(self._plot_width())
+            first, last = self.view
+            low, high = (min(ys), max(ys)) if ys else (0, 1)
+            if low == high:
+                low, high = low - 1, high + 1
+            x_scale = (right - left) / max(last - first, 1)
+            y_scale = (bottom - top) / (high - low)
+            points = []
+            for x, y in zip(xs, ys):
+                points.append(left + (x - first) * x_scale)
+                points.append(bottom - (y - low) * y_scale)
+            if len(points) == 2:
+                points *= 2 # A line item needs two points
+            if points:
+                self.coords(self._line, *points)
+            self.itemconfigure(self._line, state='normal' if points else 'hidden')
+            self.itemconfigure(self._y_max, text=f"{high:,.1f}")
+            self.itemconfigure(self._y_min, text=f"{low:,.1f}")
+            self.itemconfigure(self._x_start, text=date.fromordinal(first).isoformat())
+            self.itemconfigure(self._x_end, text=date.fromordinal(last).isoformat())
+
+    def _start_pan(self, event):
+        self._drag_x = event.x
+
+    def _pan(self, event):
+        if self.view is None or self._drag_x is None:
+            return
+        first, last = self.view
+        # Whole days only, so panned views repeat and hit the cache
+        shift = round((self._drag_x - event.x) * (last - first) / self._plot_width())
+        shift = max(self.xs[0] - first, min(shift, self.xs[-1] - last))
+        if shift:
+            self._drag_x = event.x
+            self.view = (first + shift, last + shift)
+            self.redraw()
+
+    def _zoom(self, x, factor):
+        if self.view is None:
+            return
+        first, last = self.view
+        span = last - first
+        anchor = first + (x - self.PAD_LEFT) / self._plot_width() * span
+        new_span = min(max(round(span * factor), self.MIN_SPAN_DAYS), self.xs[-1] - self.xs[0])
+        new_first = round(anchor - (anchor - first) * new_span / max(span, 1))
+        new_first = max(self.xs[0], min(new_first, self.xs[-1] - new_span))
+        if (new_first, new_first + new_span) != self.view:
+            self.view = (new_first, new_first + new_span)
+            self.redraw()
 
 
 class AnalysisWindow(tk.Toplevel):
     """A window to display monthly and yearly analysis."""
-    def __init__(self, master, data_handler):
+    def __init__(self, master, data_handler, storage_worker):
         super().__init__(master)
         self.title("Data Analysis")
-        self.geometry("600x450")
+        self.geometry("650x720")
         self.configure(bg=StyleManager.COLOR_BACKGROUND)
         self.data_handler = data_handler
+        self.storage_worker = storage_worker
+        self.range_report = None
+        self._range_started = None
+        self._report_request = 0
+        self._chart_request = 0
         
         self.transient(master)
         self.grab_set()
+        # Closing only hides the window so it can be reused
+        self.protocol("WM_DELETE_WINDOW", self.hide)
 
         StyleManager.apply_styles()
 
@@ -365,12 +3069,47 @@ class AnalysisWindow(tk.Toplevel):
         months = [date(2000, m, 1).strftime('%B') for m in range(1, 13)]
         
         ttk.Label(control_frame, text="Year:", style='Card.TLabel').pack(side='left', padx=5)
-        ttk.Combobox(control_frame, textvariable=self.year_var, values=[y for y in range(today.year - 5, today.year + 1)], width=6).pack(side='left', padx=5)
+        self.year_cb = ttk.Combobox(control_frame, textvariable=self.year_var, values=[y for y in range(today.year - 5, today.year + 1)], width=6)
+        self.year_cb.pack(side='left', padx=5)
         
         ttk.Label(control_frame, text="Month:", style='Card.TLabel').pack(side='left', padx=5)
         ttk.Combobox(control_frame, textvariable=self.month_var, values=["All"] + months, width=10).pack(side='left', padx=5)
         
         ttk.Button(control_frame, text="Generate Report", command=self.generate_report).pack(side='left', padx=10)
+        ttk.Button(control_frame, text="Trends", command=self.generate_trends_report).pack(side='left', padx=5)
+
+        # --- Date Range Controls ---
+        range_frame = ttk.Frame(self, style='Card.TFrame')
+        range_frame.pack(padx=10, fill='x')
+
+        self.range_start_var = tk.StringVar(value=date(today.year, 1, 1).strftime('%Y-%m-%d'))
+        self.range_end_var = tk.StringVar(value=today.strftime('%Y-%m-%d'))
+
+        ttk.Label(range_frame, text="From:", style='Card.TLabel').pack(side='left', padx=5)
+        ttk.Entry(range_frame, textvariable=self.range_start_var, width=11).pack(side='left', padx=5)
+        ttk.Label(range_frame, text="To:", style='Card.TLabel').pack(side='left', padx=5)
+        ttk.Entry(range_frame, textvariable=self.range_end_var, width=11).pack(side='left', padx=5)
+        ttk.Button(range_frame, text="Range Report", command=self.generate_range_report).pack(side='left', padx=5)
+        ttk.Button(range_frame, text="All Time", command=self.generate_all_time_report).pack(side='left', padx=5)
+        self.cancel_button = ttk.Button(range_frame, text="Cancel", command=self.cancel_range_report, state='disabled')
+        self.cancel_button.pack(side='left', padx=5)
+        ttk.Button(range_frame, text="Export...", command=self.export_range).pack(side='left', padx=5)
+
+        # --- Chart Controls ---
+        chart_frame = ttk.Frame(self, style='Card.TFrame')
+        chart_frame.pack(padx=10, pady=(10, 0), fill='x')
+
+        self.chart_field_var = tk.StringVar(value=FIELDS['money_spent'].label)
+        ttk.Label(chart_frame, text="Chart:", style='Card.TLabel').pack(side='left', padx=5)
+        ttk.Combobox(chart_frame, textvariable=self.chart_field_var, state='readonly', width=18,
+                     values=[FIELDS[field].label for field in NUMERIC_FIELDS]).pack(side='left', padx=5)
+        ttk.Button(chart_frame, text="Show Chart", command=self.show_chart).pack(side='left', padx=5)
+
+        self.progress = ttk.Progressbar(self, mode='determinate')
+        self.progress.pack(padx=10, pady=(10, 0), fill='x')
+
+        # Packed above the report the first time a chart is shown
+        self.chart = TrendChart(self, height=220)
 
         # --- Display Area ---
         self.report_text = tk.Text(self, wrap='word', height=20, width=70,
@@ -380,37 +3119,241 @@ class AnalysisWindow(tk.Toplevel):
         self.report_text.pack(pady=10, padx=10, fill='both', expand=True)
         self.report_text.config(state='disabled')
 
+        self.storage_worker.submit(self.data_handler.available_years, on_done=self._add_known_years)
+
     def generate_report(self):
-        year = int(self.year_var.get())
-        month_str = self.month_var.get()
-        
-        year_data = self.data_handler.load_year_data(year)
-        
-        if not year_data:
-            self.display_report(f"No data found for the year {year}.")
+        try:
+            year = int(self.year_var.get())
+        except ValueError:
+            messagebox.showerror("Invalid Year", "Please select a valid year.", parent=self)
             return
+        month_str = self.month_var.get()
+        self._report_request += 1
+        request = self._report_request
+        self.display_report("Generating report...")
+        requested = time.perf_counter()
+        self.storage_worker.submit(
+            self.data_handler.year_summaries, year,
+            on_done=lambda monthly: self._show_report(request, year, month_str, monthly, requested),
+            on_error=lambda exc: self._show_report_error(request, exc),
+        )
+
+    def _is_current(self, request):
+        return request == self._report_request and self.winfo_exists()
+
+    def _show_report_error(self, request, exc):
+        if self._is_current(request):
+            self.display_report(f"The report could not be computed: {exc}")
+
+    def _show_report(self, request, year, month_str, monthly, requested):
+        if not self._is_current(request):
+            return # Superseded by a newer request, or the window was closed
+        metrics.record('report.generate', (time.perf_counter() - requested) * 1000)
 
         if month_str == "All":
-            self.run_yearly_analysis(year, year_data)
+            if not monthly:
+                self.display_report(f"No data found for the year {year}.")
+                return
+            self.run_yearly_analysis(year, merge_summaries(monthly.values()), monthly)
         else:
             month_num = datetime.strptime(month_str, '%B').month
-            self.run_monthly_analysis(year, month_num, month_str, year_data)
+            if month_num not in monthly:
+                self.display_report(f"No data found for {month_str} {year}.")
+                return
+            self.run_monthly_analysis(year, month_str, monthly[month_num])
 
-    def run_monthly_analysis(self, year, month_num, month_str, year_data):
-        report_data = {
-            'earned': 0, 'spent': 0, 'study_time': 0,
-            'improvement_time': 0, 'entries': 0
-        }
-        
-        for date_str, data in year_data.items():
-            entry_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            if entry_date.month == month_num:
-                report_data['entries'] += 1
-                report_data['earned'] += data.get('money_earned', 0)
-                report_data['spent'] += data.get('money_spent', 0)
-                report_data['study_time'] += data.get('education_time', 0)
-                report_data['improvement_time'] += data.get('self_improvement_time', 0)
+    def generate_trends_report(self):
+        """Streaks and moving averages over the whole history, up to the range's end date."""
+        try:
+            as_of = datetime.strptime(self.range_end_var.get().strip(), '%Y-%m-%d').date()
+        except ValueError:
+            messagebox.showerror("Invalid Date", "Please enter dates as YYYY-MM-DD.", parent=self)
+            return
+        self._report_request += 1
+        request = self._report_request
+        self.display_report("Computing trends...")
+        self.storage_worker.submit(
+            history_trends, self.data_handler, as_of,
+            on_done=lambda trends: self.run_trend_analysis(request, trends),
+            on_error=lambda exc: self._show_report_error(request, exc),
+        )
+
+    def show_chart(self):
+        """Charts the chosen field over the From/To range."""
+        try:
+            start_date = datetime.strptime(self.range_start_var.get().strip(), '%Y-%m-%d').date()
+            end_date = datetime.strptime(self.range_end_var.get().strip(), '%Y-%m-%d').date()
+        except ValueError:
+            messagebox.showerror("Invalid Date", "Please enter dates as YYYY-MM-DD.", parent=self)
+            return
+        if start_date > end_date:
+            messagebox.showerror("Invalid Range", "The start date must not be after the end date.", parent=self)
+            return
+        field = next(f for f in NUMERIC_FIELDS if FIELDS[f].label == self.chart_field_var.get())
+        self._chart_request += 1
+        request = self._chart_request
+        title = f"{FIELDS[field].form_label.rstrip(':')}, {start_date} to {end_date}"
+        self.storage_worker.submit(
+            field_series, self.data_handler, start_date, end_date, field,
+            on_done=lambda series: self._show_chart(request, title, series),
+            on_error=lambda exc: messagebox.showerror("Chart Failed", f"Could not load the chart data: {exc}", parent=self),
+        )
+
+    def _show_chart(self, request, title, series):
+        if request != self._chart_request or not self.winfo_exists():
+            return
+        if not self.chart.winfo_manager():
+            self.chart.pack(padx=10, pady=(10, 0), fill='x', before=self.report_text)
+        xs, ys = series
+        self.chart.set_series(title if xs else f"{title}: no data", xs, ys)
+
+    def generate_range_report(self):
+        try:
+            start_date = datetime.strptime(self.range_start_var.get().strip(), '%Y-%m-%d').date()
+            end_date = datetime.strptime(self.range_end_var.get().strip(), '%Y-%m-%d').date()
+        except ValueError:
+            messagebox.showerror("Invalid Date", "Please enter dates as YYYY-MM-DD.", parent=self)
+            return
+        if start_date > end_date:
+            messagebox.showerror("Invalid Range", "The start date must not be after the end date.", parent=self)
+            return
+        self.start_range_report(start_date, end_date)
 
+    def _add_known_years(self, years):
+        """Offers every year that has data, alongside the last few years."""
+        if self.winfo_exists():
+            current = [int(y) for y in self.year_cb.cget('values')]
+            self.year_cb.config(values=sorted(set(current) | set(years)))
+
+    def generate_all_time_report(self):
+        self.storage_worker.submit(self.data_handler.available_years, on_done=self._start_all_time_report)
+
+    def _start_all_time_report(self, years):
+        if not self.winfo_exists():
+            return
+        if not years:
+            self.display_report("No data found.")
+            return
+        start_date, end_date = date(years[0], 1, 1), date(years[-1], 12, 31)
+        self.range_start_var.set(start_date.strftime('%Y-%m-%d'))
+        self.range_end_var.set(end_date.strftime('%Y-%m-%d'))
+        self._launch_range_report(start_date, end_date, years)
+
+    def start_range_report(self, start_date, end_date):
+        """Starts a range report in the background and polls it with `after()`."""
+        self.storage_worker.submit(
+            self.data_handler.available_years,
+            on_done=lambda years: self._launch_range_report(start_date, end_date, years),
+        )
+
+    def _launch_range_report(self, start_date, end_date, years):
+        if not self.winfo_exists():
+            return
+        self.cancel_range_report()
+        self.range_report = RangeReport(self.data_handler, start_date, end_date, years)
+        if not self.range_report.years:
+            self.range_report = None
+            self.display_report(f"No data found between {start_date} and {end_date}.")
+            return
+        self.range_report.start()
+        self._range_started = time.perf_counter()
+        self.progress.config(maximum=len(self.range_report.years), value=0)
+        self.cancel_button.config(state='normal')
+        self.display_report(f"Computing report for {start_date} to {end_date}...")
+        self.after(REPORT_POLL_MS, self._poll_range_report, self.range_report)
+
+    def _poll_range_report(self, job):
+        if job is not self.range_report or job.cancelled:
+            return # Superseded or cancelled
+        finished, _ = job.progress()
+        self.progress.config(value=finished)
+        if not job.done():
+            self.after(REPORT_POLL_MS, self._poll_range_report, job)
+            return
+
+        self.range_report = None
+        self.cancel_button.config(state='disabled')
+        try:
+            report_data, per_year = job.result()
+        except Exception as exc:
+            self.display_report(f"The report could not be computed: {exc}")
+            return
+        metrics.record('report.range', (time.perf_counter() - self._range_started) * 1000)
+        if not report_data['entries']:
+            self.display_report(f"No data found between {job.start_date} and {job.end_date}.")
+            return
+        self.run_range_analysis(job.start_date, job.end_date, report_data, per_year)
+
+    def export_range(self):
+        """Exports the From/To range to a CSV or JSONL file in the background."""
+        try:
+            start_date = datetime.strptime(self.range_start_var.get().strip(), '%Y-%m-%d').date()
+            end_date = datetime.strptime(self.range_end_var.get().strip(), '%Y-%m-%d').date()
+        except ValueError:
+            messagebox.showerror("Invalid Date", "Please enter dates as YYYY-MM-DD.", parent=self)
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Export Data", defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl")],
+        )
+        if not path:
+            return
+        fmt = 'jsonl' if path.lower().endswith('.jsonl') else 'csv'
+
+        def write_export():
+            with open(path, 'w', newline='', encoding='utf-8') as out:
+                return export_history(self.data_handler, out, start_date, end_date, fmt)
+
+        self.storage_worker.submit(
+            write_export,
+            on_done=lambda count: messagebox.showinfo("Export Complete", f"Exported {count} days to {path}.", parent=self),
+            on_error=lambda exc: messagebox.showerror("Export Failed", str(exc), parent=self),
+        )
+
+    def cancel_range_report(self):
+        if self.range_report is None:
+            return
+        self.range_report.cancel()
+        self.range_report = None
+        self.cancel_button.config(state='disabled')
+        self.progress.config(value=0)
+        self.display_report("Report cancelled.")
+
+    def show(self):
+        self.deiconify()
+        self.lift()
+        self.grab_set()
+        self.storage_worker.submit(self.data_handler.available_years, on_done=self._add_known_years)
+
+    def hide(self):
+        if self.range_report is not None:
+            self.cancel_range_report()
+        self.grab_release()
+        self.withdraw()
+
+    def destroy(self):
+        if self.range_report is not None:
+            self.range_report.cancel()
+            self.range_report = None
+        super().destroy()
+
+    @staticmethod
+    def _format_average(report_data, key, unit):
+        days = report_data[f'{key}_days']
+        if not days:
+            return "no entries"
+        return f"{report_data[f'{key}_total'] / days:.1f} {unit} ({days} days)"
+
+    @staticmethod
+    def _format_habits(report_data):
+        entries = report_data['entries']
+        return "\n".join(
+            f"  - {FIELDS[field].label}: {report_data[key] / entries * 100 if entries else 0:.1f}% "
+            f"({report_data[key]}/{entries} days)"
+            for key, field in HABIT_TOTALS.items()
+        )
+
+    def run_monthly_analysis(self, year, month_str, report_data):
         net = report_data['earned'] - report_data['spent']
         total_prod_time = report_data['study_time'] + report_data['improvement_time']
         
@@ -428,27 +3371,22 @@ Productivity Summary:
   - Total Study Time: {report_data['study_time']} minutes
   - Total Self-Improvement: {report_data['improvement_time']} minutes
   - Combined Total: {total_prod_time} minutes
+
+Health Summary:
+  - Average Sleep: {self._format_average(report_data, 'sleep', 'hours')}
+  - Average Water Intake: {self._format_average(report_data, 'water', 'L')}
 """
         )
         self.display_report(report)
 
-    def run_yearly_analysis(self, year, year_data):
-        report_data = {
-            'earned': 0, 'spent': 0, 'study_time': 0, 'improvement_time': 0,
-            'juice_days': 0, 'entries': len(year_data)
-        }
-        
-        for data in year_data.values():
-            report_data['earned'] += data.get('money_earned', 0)
-            report_data['spent'] += data.get('money_spent', 0)
-            report_data['study_time'] += data.get('education_time', 0)
-            report_data['improvement_time'] += data.get('self_improvement_time', 0)
-            if data.get('morning_juice') == 'Yes':
-                report_data['juice_days'] += 1
-
+    def run_yearly_analysis(self, year, report_data, monthly):
         net = report_data['earned'] - report_data['spent']
         total_prod_time = report_data['study_time'] + report_data['improvement_time']
-        juice_consistency = (report_data['juice_days'] / report_data['entries'] * 100) if report_data['entries'] > 0 else 0
+        breakdown = "\n".join(
+            f"  - {date(2000, month, 1).strftime('%B'):<10} {data['entries']:>3} days, "
+            f"net ${data['earned'] - data['spent']:.2f}"
+            for month, data in sorted(monthly.items())
+        )
         
         report = (
             f"""--- Yearly Analysis for {year} ---
@@ -465,8 +3403,98 @@ Productivity Summary:
   - Total Self-Improvement: {report_data['improvement_time']} minutes
   - Combined Total: {total_prod_time} minutes
 
+Health Summary:
+  - Average Sleep: {self._format_average(report_data, 'sleep', 'hours')}
+  - Average Water Intake: {self._format_average(report_data, 'water', 'L')}
+
 Habit Consistency:
-  - Morning Healthy Juice: {juice_consistency:.1f}% ({report_data['juice_days']}/{report_data['entries']} days)
+{self._format_habits(report_data)}
+
+Monthly Breakdown:
+{breakdown}
+"""
+        )
+        self.display_report(report)
+
+    def run_range_analysis(self, start_date, end_date, report_data, per_year):
+        net = report_data['earned'] - report_data['spent']
+        total_prod_time = report_data['study_time'] + report_data['improvement_time']
+        breakdown = "\n".join(
+            f"  - {year}  {data['entries']:>3} days, net ${data['earned'] - data['spent']:.2f}"
+            for year, data in sorted(per_year.items())
+        )
+
+        report = (
+            f"""--- Analysis for {start_date} to {end_date} ---
+
+Total Days with Entries: {report_data['entries']}
+
+Financial Summary:
+  - Total Earned: ${report_data['earned']:.2f}
+  - Total Spent:  ${report_data['spent']:.2f}
+  - Net Balance:  ${net:.2f}
+
+Productivity Summary:
+  - Total Study Time: {report_data['study_time']} minutes
+  - Total Self-Improvement: {report_data['improvement_time']} minutes
+  - Combined Total: {total_prod_time} minutes
+
+Health Summary:
+  - Average Sleep: {self._format_average(report_data, 'sleep', 'hours')}
+  - Average Water Intake: {self._format_average(report_data, 'water', 'L')}
+
+Habit Consistency:
+{self._format_habits(report_data)}
+
+Yearly Breakdown:
+{breakdown}
+"""
+        )
+        self.display_report(report)
+
+    def run_trend_analysis(self, request, trends):
+        if not self._is_current(request):
+            return
+        if not trends['entries']:
+            self.display_report(f"No data found up to {trends['as_of']}.")
+            return
+        windows = sorted(trends['windows'])
+        streaks = "\n".join(
+            f"  - {FIELDS[habit].label}: current {streak['current']} days, longest {streak['longest']} days"
+            + (f" (ended {streak['longest_end']})" if streak['longest_end'] else "")
+            for habit, streak in trends['streaks'].items()
+        )
+
+        def table(value_of):
+            return "\n".join(
+                f"  - {FIELDS[field].label:<18}" + " / ".join(value_of(trends['windows'][size][field])
+                                                             for size in windows)
+                for field in NUMERIC_FIELDS
+            )
+
+        peak_size = windows[len(windows) // 2]
+        peaks = "\n".join(
+            f"  - {FIELDS[field].label:<18}{_as_number(round(stats['peak_sum'], 2)):,} (to {stats['peak_end']})"
+            for field, stats in trends['windows'][peak_size].items() if stats['peak_sum']
+        )
+        sizes = " / ".join(str(size) for size in windows)
+
+        report = (
+            f"""--- Trends up to {trends['as_of']} ---
+
+History: {trends['entries']} days with entries ({trends['first']} to {trends['last']})
+
+Habit Streaks:
+{streaks}
+
+Moving Averages ({sizes} days, per day with an entry):
+{table(lambda stats: "-" if stats['average'] is None else f"{stats['average']:,.1f}")}
+
+Rolling Sums ({sizes} days):
+{table(lambda stats: f"{_as_number(round(stats['sum'], 2)):,}" if stats['days'] else "-")}
+
+Highest {peak_size}-Day Totals:
+{peaks}
 """
         )
         self.display_report(report)
@@ -478,6 +3506,290 @@ Habit Consistency:
         self.report_text.config(state='disabled')
 
 
-if __name__ == "__main__":
-    app = HabitTrackerApp()
+class SearchWindow(tk.Toplevel):
+    """Searches notes as you type; choosing a result opens that date in the main window."""
+    def __init__(self, master, data_handler, storage_worker):
+        super().__init__(master)
+        self.title("Search Notes")
+        self.geometry("650x450")
+        self.configure(bg=StyleManager.COLOR_BACKGROUND)
+        self.data_handler = data_handler
+        self.storage_worker = storage_worker
+        self.hits = []
+        self._search_after_id = None
+        self._request = 0
+
+        control_frame = ttk.Frame(self, style='Card.TFrame')
+        control_frame.pack(pady=10, padx=10, fill='x')
+        self.query_var = tk.StringVar()
+        ttk.Label(control_frame, text="Find:", style='Card.TLabel').pack(side='left', padx=5)
+        self.entry = ttk.Entry(control_frame, textvariable=self.query_var, width=40)
+        self.entry.pack(side='left', padx=5, fill='x', expand=True)
+        self.entry.focus_set()
+        self.query_var.trace_add('write', lambda *_: self._schedule_search())
+        self.status_var = tk.StringVar()
+        ttk.Label(control_frame, textvariable=self.status_var, style='Card.TLabel').pack(side='left', padx=5)
+
+        self.results = tk.Listbox(self, bg=StyleManager.COLOR_CARD, fg=StyleManager.COLOR_TEXT,
+                                  font=StyleManager.FONT_NORMAL, relief='sunken', borderwidth=1,
+                                  selectbackground=StyleManager.COLOR_PRIMARY,
+                                  highlightbackground=StyleManager.COLOR_BORDER, activestyle='none')
+        self.results.pack(pady=(0, 10), padx=10, fill='both', expand=True)
+        self.results.bind('<Double-Button-1>', self.open_selected)
+        self.results.bind('<Return>', self.open_selected)
+
+    def show(self):
+        self.deiconify()
+        self.lift()
+        self.entry.focus_set()
+
+    def _schedule_search(self):
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(LOAD_DEBOUNCE_MS, self.search)
+
+    def search(self):
+        self._search_after_id = None
+        self._request += 1
+        request = self._request
+        self.storage_worker.submit(
+            self.data_handler.search_notes, self.query_var.get(),
+            on_done=lambda hits: self._show_results(request, hits),
+            on_error=lambda exc: self.status_var.set(f"Search failed: {exc}"),
+        )
+
+    def _show_results(self, request, hits):
+        if request != self._request or not self.winfo_exists():
+            return # A newer search is on its way, or the window was closed
+        self.hits = hits
+        self.results.delete(0, tk.END)
+        for date_key, snippet in hits:
+            self.results.insert(tk.END, f"{date_key}   {snippet}")
+        more = "+" if len(hits) >= SEARCH_LIMIT else ""
+        self.status_var.set(f"{len(hits)}{more} result(s)" if self.query_var.get().strip() else "")
+
+    def open_selected(self, event=None):
+        selection = self.results.curselection()
+        if selection:
+            self.master.go_to_date(date.fromisoformat(self.hits[selection[0]][0]))
+
+    def destroy(self):
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        super().destroy()
+
+
+class DiagnosticsWindow(tk.Toplevel):
+    """A window showing live timings, counters and cache state."""
+    def __init__(self, master, data_handler, storage_worker):
+        super().__init__(master)
+        self.title("Diagnostics")
+        self.geometry("700x450")
+        self.configure(bg=StyleManager.COLOR_BACKGROUND)
+        self.data_handler = data_handler
+        self.storage_worker = storage_worker
+        self.profilers = None
+
+        control_frame = ttk.Frame(self, style='Card.TFrame')
+        control_frame.pack(pady=10, padx=10, fill='x')
+
+        self.trace_var = tk.BooleanVar(value=metrics.tracing)
+        self.trace_path = os.path.join(data_handler.data_dir, TRACE_FILE_NAME)
+        self.profile_path = os.path.join(data_handler.data_dir, PROFILE_FILE_NAME)
+        ttk.Checkbutton(control_frame, text="Write trace file", variable=self.trace_var,
+                        command=self.toggle_trace).pack(side='left', padx=10)
+        self.profile_button = ttk.Button(control_frame, text="Start Profiling", command=self.toggle_profiling)
+        self.profile_button.pack(side='left', padx=10)
+        ttk.Button(control_frame, text="Reset", command=self.reset).pack(side='left', padx=10)
+
+        self.text = tk.Text(self, wrap='none', bg=StyleManager.COLOR_CARD, fg=StyleManager.COLOR_TEXT,
+                            font=("Consolas", 10), relief='sunken', borderwidth=1,
+                            highlightbackground=StyleManager.COLOR_BORDER)
+        self.text.pack(pady=10, padx=10, fill='both', expand=True)
+        self.text.config(state='disabled')
+        self._refresh_id = None
+        self.refresh()
+
+    def refresh(self):
+        """Fetches the cache state on the storage worker, which owns the cache, then redraws."""
+        self._refresh_id = None
+        if hasattr(self.data_handler, 'cache_stats'):
+            self.storage_worker.submit(self.data_handler.cache_stats, on_done=self._render,
+                                       on_error=lambda exc: self._render(None))
+        else:
+            self._render(None)
+
+    def _render(self, stats):
+        if not self.winfo_exists():
+            return # Closed while the stats were being fetched
+        timings, counters = metrics.snapshot()
+        lines = [f"{'Metric':<26}{'Calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'Bytes':>14}"]
+        for name in sorted(timings):
+            t = timings[name]
+            lines.append(f"{name:<26}{t['calls']:>8}{t['p50']:>10.2f}{t['p95']:>10.2f}{t['max']:>10.2f}{t['bytes']:>14,}")
+        if counters:
+            lines.append("")
+            lines.append("Counters:")
+            lines.extend(f"  {name:<24}{value:>10,}" for name, value in sorted(counters.items()))
+        if stats is not None:
+            lines.append("")
+            lines.append(f"Year cache: {stats['hits']} hits, {stats['misses']} misses, "
+                         f"cached {stats['cached_years']}")
+        if metrics.tracing:
+            lines.append(f"Tracing to {self.trace_path}")
+
+        self.text.config(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', "\n".join(lines))
+        self.text.config(state='disabled')
+        self._refresh_id = self.after(DIAGNOSTICS_REFRESH_MS, self.refresh)
+
+    def toggle_trace(self):
+        if self.trace_var.get():
+            metrics.start_trace(self.trace_path)
+        else:
+            metrics.stop_trace()
+
+    def toggle_profiling(self):
+        """Profiles both the Tk thread and the storage worker thread."""
+        import cProfile # Imported on first use to keep startup fast
+        if self.profilers is None:
+            self.profilers = (cProfile.Profile(), cProfile.Profile())
+            self.profilers[0].enable()
+            self.storage_worker.submit(self.profilers[1].enable)
+            self.profile_button.config(text="Stop Profiling")
+        else:
+            self._stop_profiling(show_result=True)
+
+    def _stop_profiling(self, show_result=False):
+        main_profiler, worker_profiler = self.profilers
+        self.profilers = None
+        main_profiler.disable()
+
+        def dump(_):
+            import pstats
+            stats = pstats.Stats(main_profiler)
+            stats.add(worker_profiler)
+            stats.dump_stats(self.profile_path)
+            if show_result and self.winfo_exists():
+                messagebox.showinfo("Profile Saved", f"Profile written to {self.profile_path}.", parent=self)
+
+        self.storage_worker.submit(worker_profiler.disable, on_done=dump)
+        if self.winfo_exists():
+            self.profile_button.config(text="Start Profiling")
+
+    def reset(self):
+        metrics.reset()
+
+    def destroy(self):
+        if self._refresh_id is not None:
+            self.after_cancel(self._refresh_id)
+            self._refresh_id = None
+        if self.profilers is not None:
+            self._stop_profiling()
+        super().destroy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=APP_TITLE)
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('migrate-sqlite', help="Copy the JSON year files into the SQLite database")
+    subparsers.add_parser('migrate-binary', help="Copy the JSON year files into memory-mapped binary year files")
+    subparsers.add_parser('migrate-json', help="Copy the binary year files back into the JSON year files")
+    subparsers.add_parser('rebuild-rollups', help="Recompute the monthly report totals from the JSON year files")
+    subparsers.add_parser('check-rollups', help="Compare the monthly report totals against a full scan")
+    subparsers.add_parser('rebuild-index', help="Rebuild the note search index from the JSON year files")
+    import_parser = subparsers.add_parser('import', help="Bulk import historical days from a CSV or JSONL file")
+    import_parser.add_argument('path', help="File with a 'date' column/key plus any tracked fields")
+    import_parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension")
+    export_parser = subparsers.add_parser('export', help="Export a date range to CSV or JSONL")
+    export_parser.add_argument('path', help="Output file, or - for standard output")
+    export_parser.add_argument('--start', help="First date (YYYY-MM-DD); defaults to the first year with data")
+    export_parser.add_argument('--end', help="Last date (YYYY-MM-DD); defaults to the last year with data")
+    export_parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension")
+    export_parser.add_argument('--fields', help="Comma-separated fields to export (default: all)")
+    export_parser.add_argument('--months', help="Comma-separated months to include, e.g. 1,2,12")
+    export_parser.add_argument('--weekdays', help="Comma-separated weekdays to include, 0=Monday")
+    parser.add_argument('--startup-time', action='store_true',
+                        help="Start the app, print time to first frame and to interactive, then exit")
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate-sqlite':
+        count = migrate_json_to_sqlite(DATA_DIR)
+        print(f"Migrated {count} days into {os.path.join(DATA_DIR, SQLITE_DB_NAME)}.")
+        return
+    if args.command == 'migrate-binary':
+        count = migrate_json_to_binary(DATA_DIR)
+        print(f"Migrated {count} days into {DATA_DIR}/<year>.days.")
+        return
+    if args.command == 'migrate-json':
+        count = migrate_binary_to_json(DATA_DIR)
+        print(f"Migrated {count} days into {DATA_DIR}/<year>.json.")
+        return
+    if args.command == 'rebuild-rollups':
+        handler = DataHandler(DATA_DIR)
+        handler.rebuild_rollups()
+        print(f"Rebuilt monthly totals for {len(handler.available_years())} year(s).")
+        return
+    if args.command == 'check-rollups':
+        mismatches = DataHandler(DATA_DIR).check_rollups()
+        for year, month, stored, scanned in mismatches:
+            if month is None:
+                print(f"{year}: stored totals are out of date")
+            else:
+                print(f"{year}-{month:02d}: stored {stored} != scanned {scanned}")
+        print("Monthly totals are consistent." if not mismatches else f"{len(mismatches)} mismatch(es) found.")
+        sys.exit(1 if mismatches else 0)
+    if args.command == 'rebuild-index':
+        count = DataHandler(DATA_DIR).rebuild_notes_index()
+        print(f"Indexed {count} notes.")
+        return
+    if args.command == 'import':
+        handler = create_data_handler()
+        try:
+            result = import_history(args.path, handler, args.format)
+        finally:
+            handler.close()
+        for line_num, reason in result['errors']:
+            print(f"Line {line_num}: {reason}")
+        rate = result['rows'] / result['seconds'] if result['seconds'] else 0
+        print(f"Read {result['rows']} rows in {result['seconds']:.2f}s ({rate:,.0f} rows/s): "
+              f"{result['imported']} days imported across {len(result['years'])} year(s), "
+              f"{result['rejected']} rejected.")
+        sys.exit(1 if result['rejected'] else 0)
+    if args.command == 'export':
+        handler = create_data_handler()
+        try:
+            years = handler.available_years()
+            if not years and not (args.start and args.end):
+                print("No data to export.")
+                return
+            try:
+                start_date = date.fromisoformat(args.start) if args.start else date(years[0], 1, 1)
+                end_date = date.fromisoformat(args.end) if args.end else date(years[-1], 12, 31)
+                months = [int(m) for m in args.months.split(',')] if args.months else None
+                weekdays = [int(d) for d in args.weekdays.split(',')] if args.weekdays else None
+            except ValueError as exc:
+                parser.error(str(exc))
+            fields = args.fields.split(',') if args.fields else None
+            unknown = [field for field in fields or [] if field not in TRACKED_FIELDS]
+            if unknown:
+                parser.error(f"unknown field(s): {', '.join(unknown)}")
+            fmt = args.format or ('jsonl' if args.path.lower().endswith('.jsonl') else 'csv')
+            if args.path == '-':
+                count = export_history(handler, sys.stdout, start_date, end_date, fmt, fields, months, weekdays)
+            else:
+                with open(args.path, 'w', newline='', encoding='utf-8') as out:
+                    count = export_history(handler, out, start_date, end_date, fmt, fields, months, weekdays)
+                print(f"Exported {count} days to {args.path}.")
+        finally:
+            handler.close()
+        return
+
+    app = HabitTrackerApp(report_startup=args.startup_time)
     app.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 @echo off
 D:
 cd "D:\habit_tracker"
-python main.py
+REM Run as a module so Python reuses its cached bytecode instead of recompiling main.py
+python -m main